@@ -0,0 +1,10 @@
+# Benchmarks das funções de src/ com dados sintéticos no formato do student_habits_performance.csv.
+# Uso (a partir da raiz do projeto): python -m benchmarks.executar_benchmarks --linhas 10000 100000
+import os
+import sys
+
+# Os módulos de src importam uns aos outros pelo nome (por exemplo, 'import funcoes_analise_uni as au'), como nos
+# notebooks; colocamos a pasta src no sys.path aqui, no ponto de entrada dos benchmarks, e importamos sempre pelo nome.
+_PASTA_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if _PASTA_SRC not in sys.path:
+    sys.path.insert(0, _PASTA_SRC)
@@ -0,0 +1,227 @@
+# Executa os benchmarks das etapas do projeto (carregamento, imputação, deduplicação, discretização, estatísticas
+# descritivas e condicionais, tabelas cruzadas, correlação e PCA) sobre CSVs sintéticos de vários tamanhos.
+# Cada caso roda em um processo novo, para que o pico de memória (RSS) medido seja só dele; a preparação dos dados
+# de entrada (leitura do CSV, pré-processamento) não entra no tempo medido.
+#
+# Uso: python -m benchmarks.executar_benchmarks --linhas 10000 100000 --casos correlacao_pearson pca_eigh --saida resultados.json
+import os
+import io
+import json
+import time
+import argparse
+import tempfile
+import traceback
+import resource
+import contextlib
+import multiprocessing
+import queue
+import numpy as np
+import pandas as pd
+from benchmarks.gerador_sintetico import escrever_csv_sintetico
+
+
+# Dados de entrada de um caso, criados sob demanda dentro do processo do benchmark.
+class Contexto:
+
+    def __init__(self, caminho_csv: str):
+        self.caminho_csv = caminho_csv
+        self._cache = {}
+
+    def _obter(self, nome, criar):
+        if nome not in self._cache:
+            self._cache[nome] = criar()
+        return self._cache[nome]
+
+    @property
+    def bruto(self) -> pd.DataFrame:
+        return self._obter('bruto', lambda: pd.read_csv(self.caminho_csv))
+
+    @property
+    def processado(self) -> pd.DataFrame:
+        import funcoes_pre_processamento as pp
+        return self._obter('processado', lambda: pp.discretizar_variavel_alvo(pp.remover_duplicatas(pp.tratar_dados_faltantes(self.bruto))))
+
+    @property
+    def variaveis(self) -> tuple:
+        import funcoes_pre_processamento as pp
+        import funcoes_analise_uni as au
+        return self._obter('variaveis', lambda: au.separar_variaveis(pp.obter_dicionario_de_dados()))
+
+    @property
+    def matriz_pca(self) -> pd.DataFrame:
+        import funcoes_pre_processamento as pp
+        numericas, categoricas = self.variaveis
+        return self._obter('matriz_pca', lambda: pp.montar_matriz_preditores(self.processado, numericas, categoricas)[0])
+
+    # Matriz de características em float32 gravada ao lado do CSV e aberta por memmap (veja funcoes_matriz).
+    @property
+    def matriz(self):
+        import funcoes_matriz as fm
+        pasta = os.path.join(os.path.dirname(self.caminho_csv), 'matriz_' + os.path.splitext(os.path.basename(self.caminho_csv))[0])
+        return self._obter('matriz', lambda: fm.montar_matriz_caracteristicas(self.processado, pasta))
+
+    @property
+    def pca(self):
+        import funcoes_pca as fpca
+        return self._obter('pca', lambda: fpca.PCA(n_componentes=2, semente=0).fit(self.matriz_pca))
+
+    @property
+    def projecao_pca(self) -> np.ndarray:
+        return self._obter('projecao_pca', lambda: self.pca.transform(self.matriz_pca))
+
+
+# Cada caso é um par (preparação, execução) de funções que recebem o Contexto; a preparação cria as entradas
+# e não é cronometrada.
+def _casos() -> dict:
+    import funcoes_pre_processamento as pp
+    import funcoes_analise_uni as au
+    import funcoes_correlacao as fc
+    import funcoes_pca as fpca
+    import funcoes_paralelo as fp
+
+    return {
+        'carregamento': (lambda c: None, lambda c: pp.carregar_dados(c.caminho_csv)),
+        'carregamento_compacto': (lambda c: None, lambda c: pp.carregar_dados(c.caminho_csv, tipos_compactos=True)),
+        'imputacao': (lambda c: c.bruto, lambda c: pp.tratar_dados_faltantes(c.bruto)),
+        'deduplicacao': (lambda c: c.bruto, lambda c: pp.remover_duplicatas(c.bruto)),
+        'discretizacao': (lambda c: c.bruto, lambda c: pp.discretizar_variavel_alvo(c.bruto)),
+        'discretizacao_inplace': (lambda c: c.bruto, lambda c: pp.discretizar_variavel_alvo(c.bruto, inplace=True)),
+        'discretizacao_esquemas': (lambda c: c.bruto, lambda c: pp.avaliar_esquemas_discretizacao(c.bruto, {
+            'padrao': pp.BINS_PERFORMANCE, 'notebook': [0, 50, 85, 100], 'quartis': {'quantis': 4}, 'decis': {'quantis': 10}})),
+        'pre_processamento_em_blocos': (lambda c: None, lambda c: pp.executar_pre_processamento_em_blocos(
+            c.caminho_csv, os.path.join(os.path.dirname(c.caminho_csv), 'saida_blocos.csv'))),
+        'descritivas_quantitativas': (lambda c: c.processado, lambda c: au.estatisticas_descritivas_quantitativas(c.processado, c.variaveis[0])),
+        'descritivas_quantitativas_em_blocos': (lambda c: c.variaveis, lambda c: au.estatisticas_descritivas_quantitativas_em_blocos(c.caminho_csv, c.variaveis[0])),
+        'descritivas_qualitativas': (lambda c: c.processado, lambda c: au.estatisticas_descritivas_qualitativas(c.processado, c.variaveis[1])),
+        'condicionais_por_classe': (lambda c: c.processado, lambda c: au.estatisticas_condicionais_por_classe_especifica(
+            c.processado, c.variaveis[0], pp.LABELS_PERFORMANCE)),
+        'condicionais_por_classe_paralelo': (lambda c: c.processado, lambda c: fp.estatisticas_condicionais_paralelas(
+            c.processado, c.variaveis[0], pp.LABELS_PERFORMANCE)),
+        'descritivas_qualitativas_paralelo': (lambda c: c.processado, lambda c: fp.estatisticas_descritivas_qualitativas_paralelas(c.processado, c.variaveis[1])),
+        'descritivas_quantitativas_matriz': (lambda c: c.matriz, lambda c: au.estatisticas_descritivas_quantitativas(c.matriz, c.variaveis[0])),
+        'condicionais_por_classe_matriz': (lambda c: c.matriz, lambda c: au.estatisticas_condicionais_por_classe_especifica(
+            c.matriz, c.variaveis[0], pp.LABELS_PERFORMANCE)),
+        'tabelas_cruzadas': (lambda c: c.processado, lambda c: fc.tabelas_contingencia(c.processado, c.variaveis[1] + ['performance_class'])),
+        'tabelas_cruzadas_pandas': (lambda c: c.processado, lambda c: [
+            pd.crosstab(c.processado[a], c.processado[b]) for i, a in enumerate(c.variaveis[1]) for b in c.variaveis[1][i + 1:]]),
+        'correlacao_pearson': (lambda c: c.processado, lambda c: fc.matriz_correlacao(c.processado, c.variaveis[0])),
+        'correlacao_pearson_pandas': (lambda c: c.processado, lambda c: c.processado[c.variaveis[0]].corr()),
+        'correlacao_pearson_matriz': (lambda c: c.matriz, lambda c: fc.matriz_correlacao(c.matriz, c.variaveis[0])),
+        'correlacao_spearman': (lambda c: c.processado, lambda c: fc.matriz_correlacao(c.processado, c.variaveis[0], 'spearman')),
+        'pca_eigh': (lambda c: c.matriz_pca, lambda c: fpca.PCA(solver='eigh').fit(c.matriz_pca)),
+        'pca_randomizado': (lambda c: c.matriz_pca, lambda c: fpca.PCA(n_componentes=2, solver='randomizado', semente=0).fit(c.matriz_pca)),
+        'pca_eigh_matriz': (lambda c: c.matriz, lambda c: fpca.PCA(solver='eigh').fit(c.matriz)),
+        'pca_em_blocos': (lambda c: c.variaveis, lambda c: fpca.ajustar_pca_em_blocos(c.caminho_csv, *c.variaveis)),
+        'projecao_pontos': (lambda c: c.projecao_pca, lambda c: _renderizar_projecao(c, 'pontos')),
+        'projecao_amostra': (lambda c: c.projecao_pca, lambda c: _renderizar_projecao(c, 'amostra')),
+        'projecao_raster': (lambda c: c.projecao_pca, lambda c: _renderizar_projecao(c, 'raster')),
+    }
+
+
+# Projeção do PCA desenhada e gravada em PNG (a gravação entra no tempo, já que é onde o scatter de milhões de pontos pesa).
+def _renderizar_projecao(contexto: Contexto, modo: str) -> None:
+    import matplotlib.pyplot as plt
+    import funcoes_pca as fpca
+
+    plt.switch_backend('Agg')
+    caminho = os.path.join(os.path.dirname(contexto.caminho_csv), f'projecao_{modo}.png')
+    fig = fpca.renderizar_projecao(contexto.projecao_pca, contexto.processado['performance_class'], contexto.pca.cargas(), caminho, modo=modo)
+    plt.close(fig)
+
+
+# Pico de memória residente do processo em bytes (o ru_maxrss vem em KiB no Linux e em bytes no macOS).
+def _pico_rss() -> int:
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if os.uname().sysname == 'Darwin' else pico * 1024
+
+# Executa um caso no processo filho. Uma exceção volta pela fila como {'erro': traceback}, para que o processo
+# principal registre a falha e siga para o próximo caso em vez de esperar uma medida que nunca chega.
+def _executar_caso(nome: str, caminho_csv: str, repeticoes: int, fila) -> None:
+    try:
+        preparar, executar = _casos()[nome]
+        contexto = Contexto(caminho_csv)
+        with contextlib.redirect_stdout(io.StringIO()):
+            preparar(contexto)
+            rss_inicial = _pico_rss()
+            tempos = []
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                executar(contexto)
+                tempos.append(time.perf_counter() - inicio)
+    except Exception:
+        fila.put({'erro': traceback.format_exc()})
+        return
+    fila.put({
+        'tempo_min_s': min(tempos),
+        'tempo_mediano_s': float(np.median(tempos)),
+        'pico_rss_mb': _pico_rss() / 2**20,
+        'acrescimo_pico_rss_mb': (_pico_rss() - rss_inicial) / 2**20,
+    })
+
+# Espera a medida do processo filho. Se ele terminar sem mandar nada (morto pelo sistema por falta de memória,
+# por exemplo), devolve um erro com o código de saída em vez de bloquear para sempre.
+def _aguardar_medida(processo, fila) -> dict:
+    while True:
+        try:
+            return fila.get(timeout=1)
+        except queue.Empty:
+            if not processo.is_alive():
+                try:
+                    return fila.get(timeout=1)
+                except queue.Empty:
+                    return {'erro': f"O processo do caso terminou sem resultado (código de saída {processo.exitcode})."}
+
+
+# Roda os casos pedidos para cada número de linhas e devolve uma tabela com tempo (mínimo e mediano) e pico de RSS.
+def executar_benchmarks(linhas: list, casos: list = None, repeticoes: int = 3, pasta_dados: str = None) -> pd.DataFrame:
+    disponiveis = list(_casos())
+    casos = casos or disponiveis
+    desconhecidos = [nome for nome in casos if nome not in disponiveis]
+    if desconhecidos:
+        raise ValueError(f"Casos desconhecidos: {', '.join(desconhecidos)}. Disponíveis: {', '.join(disponiveis)}.")
+    pasta_dados = pasta_dados or tempfile.mkdtemp(prefix='benchmarks_')
+    contexto_mp = multiprocessing.get_context('spawn')
+    resultados = []
+
+    for n_linhas in linhas:
+        caminho_csv = os.path.join(pasta_dados, f'sintetico_{n_linhas}.csv')
+        if not os.path.exists(caminho_csv):
+            escrever_csv_sintetico(caminho_csv, n_linhas)
+
+        for nome in casos:
+            fila = contexto_mp.Queue()
+            processo = contexto_mp.Process(target=_executar_caso, args=(nome, caminho_csv, repeticoes, fila))
+            processo.start()
+            medida = _aguardar_medida(processo, fila)
+            processo.join()
+            resultados.append({'caso': nome, 'linhas': n_linhas, **medida})
+            if 'erro' in medida:
+                print(f"{nome:<40} {n_linhas:>12,} linhas  falhou:\n{medida['erro']}")
+                continue
+            print(f"{nome:<40} {n_linhas:>12,} linhas  {medida['tempo_min_s']:>9.4f} s  {medida['pico_rss_mb']:>9.1f} MB")
+
+    return pd.DataFrame(resultados)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks das funções de src/ com dados sintéticos.")
+    parser.add_argument('--linhas', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--casos', nargs='+', default=None, choices=list(_casos()), metavar='CASO',
+                        help=f"Casos a executar (padrão: todos): {', '.join(_casos())}.")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--pasta-dados', default=None, help="Onde guardar os CSVs sintéticos (reaproveitados entre execuções).")
+    parser.add_argument('--saida', default=None, help="Arquivo .json ou .csv para gravar os resultados.")
+    args = parser.parse_args()
+
+    resultados = executar_benchmarks(args.linhas, args.casos, args.repeticoes, args.pasta_dados)
+    if args.saida:
+        if args.saida.endswith('.json'):
+            with open(args.saida, 'w') as f:
+                json.dump(resultados.to_dict(orient='records'), f, indent=2)
+        else:
+            resultados.to_csv(args.saida, index=False)
+        print(f"Resultados salvos em: {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
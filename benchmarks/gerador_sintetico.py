@@ -0,0 +1,85 @@
+# Gerador de dados sintéticos com o mesmo esquema do student_habits_performance.csv: as colunas, a ordem e o tipo de
+# cada uma vêm do dicionário de dados (obter_dicionario_de_dados) e as categorias/faixas de valores imitam as do
+# arquivo original do Kaggle. Serve para medir como as funções de src/ escalam de 10 mil a 100 milhões de linhas.
+import os
+import numpy as np
+import pandas as pd
+import funcoes_pre_processamento as pp
+
+
+# Categorias (com as proporções aproximadas do arquivo original) de cada variável qualitativa.
+CATEGORIAS = {
+    'gender': (['Female', 'Male', 'Other'], [0.48, 0.48, 0.04]),
+    'part_time_job': (['No', 'Yes'], [0.79, 0.21]),
+    'diet_quality': (['Fair', 'Good', 'Poor'], [0.44, 0.38, 0.18]),
+    'parental_education_level': (['Bachelor', 'High School', 'Master'], [0.39, 0.43, 0.18]),
+    'internet_quality': (['Average', 'Good', 'Poor'], [0.39, 0.45, 0.16]),
+    'extracurricular_participation': (['No', 'Yes'], [0.68, 0.32]),
+}
+
+# Faixa (mínimo, máximo), média, desvio padrão e casas decimais de cada variável quantitativa (exceto exam_score,
+# que é gerada a partir das outras para manter as correlações do problema).
+FAIXAS = {
+    'age': ((17, 24), 20.5, 2.3, 0),
+    'study_hours_per_day': ((0.0, 8.3), 3.55, 1.47, 1),
+    'social_media_hours': ((0.0, 7.2), 2.51, 1.17, 1),
+    'netflix_hours': ((0.0, 5.4), 1.82, 1.08, 1),
+    'attendance_percentage': ((56.0, 100.0), 84.13, 9.4, 1),
+    'sleep_hours': ((3.2, 10.0), 6.47, 1.23, 1),
+    'exercise_frequency': ((0, 6), 3.04, 2.03, 0),
+    'mental_health_rating': ((1, 10), 5.44, 2.85, 0),
+}
+
+# Colunas do arquivo bruto, na ordem do dicionário de dados (a performance_class é criada no pré-processamento).
+def colunas_brutas() -> list:
+    colunas = pp.obter_dicionario_de_dados()['variavel'].tolist()
+    colunas.remove('performance_class')
+    faltando = [c for c in colunas if c not in CATEGORIAS and c not in FAIXAS and c not in ('student_id', 'exam_score')]
+    if faltando:
+        raise ValueError(f"Variáveis do dicionário sem especificação no gerador: {faltando}")
+    return colunas
+
+
+# Gera 'n_linhas' linhas sintéticas. 'fracao_nulos' das linhas ficam sem parental_education_level (como no original)
+# e 'fracao_duplicatas' das linhas são cópias exatas de outras linhas, para exercitar a remoção de duplicatas.
+def gerar_dados_sinteticos(n_linhas: int, semente: int = 0, fracao_nulos: float = 0.09, fracao_duplicatas: float = 0.01,
+                           primeiro_id: int = 1000) -> pd.DataFrame:
+    gerador = np.random.default_rng(semente)
+    dados = {'student_id': [f"S{i}" for i in range(primeiro_id, primeiro_id + n_linhas)]}
+
+    for coluna, ((minimo, maximo), media, desvio, casas) in FAIXAS.items():
+        valores = np.clip(gerador.normal(media, desvio, n_linhas), minimo, maximo).round(casas)
+        dados[coluna] = valores.astype(np.int64) if casas == 0 else valores
+
+    for coluna, (categorias, proporcoes) in CATEGORIAS.items():
+        codigos = gerador.choice(len(categorias), size=n_linhas, p=proporcoes)
+        dados[coluna] = pd.Categorical.from_codes(codigos, categories=categorias).astype(object)
+
+    nota = (35 + 9.5 * dados['study_hours_per_day'] - 2.5 * dados['social_media_hours'] - 2.0 * dados['netflix_hours']
+            + 0.1 * dados['attendance_percentage'] + 2.0 * dados['sleep_hours'] + 1.5 * dados['exercise_frequency']
+            + 2.0 * dados['mental_health_rating'] - 30 + gerador.normal(0, 6, n_linhas))
+    dados['exam_score'] = np.clip(nota, 0, 100).round(1)
+
+    df = pd.DataFrame(dados)[colunas_brutas()]
+
+    nulos = gerador.random(n_linhas) < fracao_nulos
+    df.loc[nulos, 'parental_education_level'] = np.nan
+
+    n_duplicatas = int(n_linhas * fracao_duplicatas)
+    if n_duplicatas > 0 and n_linhas > 1:
+        destinos = gerador.choice(np.arange(1, n_linhas), size=n_duplicatas, replace=False)
+        origens = (gerador.random(n_duplicatas) * destinos).astype(np.int64)
+        df.iloc[destinos] = df.iloc[origens].to_numpy()
+    return df
+
+
+# Escreve um CSV sintético de 'n_linhas' em blocos de 'tamanho_bloco', então arquivos de dezenas de milhões de
+# linhas podem ser gerados com memória limitada (as duplicatas ficam dentro de cada bloco).
+def escrever_csv_sintetico(caminho: str, n_linhas: int, tamanho_bloco: int = 1_000_000, semente: int = 0, **kwargs) -> str:
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(pasta, exist_ok=True)
+    for i, inicio in enumerate(range(0, n_linhas, tamanho_bloco)):
+        n = min(tamanho_bloco, n_linhas - inicio)
+        bloco = gerar_dados_sinteticos(n, semente=semente + i, primeiro_id=1000 + inicio, **kwargs)
+        bloco.to_csv(caminho, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+    return caminho
@@ -0,0 +1,70 @@
+# Verifica o orçamento de tempo de importação dos módulos de src/ que não desenham nada: cada módulo é importado em um
+# processo novo e medimos o tempo além do 'import pandas, numpy' (que todos pagam) e quais dependências pesadas
+# (matplotlib, seaborn, scipy, IPython) foram carregadas junto. Sai com código 1 se algum módulo estourar o orçamento
+# ou carregar alguma delas, para poder ser usado como verificação antes de um merge.
+#
+# Uso: python -m benchmarks.tempo_importacao --orcamento 0.3
+import os
+import sys
+import json
+import argparse
+import subprocess
+import pandas as pd
+
+
+MODULOS = [
+    'funcoes_nucleo', 'funcoes_pre_processamento', 'funcoes_analise_uni', 'funcoes_analise_bi',
+    'funcoes_correlacao', 'funcoes_esbocos', 'funcoes_pca', 'funcoes_cache', 'funcoes_instrumentacao', 'funcoes_matriz',
+]
+PROIBIDOS = ['matplotlib', 'seaborn', 'scipy', 'IPython']
+
+_PASTA_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+_SCRIPT = """
+import sys, time, json
+inicio = time.perf_counter()
+import pandas, numpy
+base = time.perf_counter()
+import {modulo}
+fim = time.perf_counter()
+print(json.dumps({{'base_s': base - inicio, 'modulo_s': fim - base,
+                  'carregados': [m for m in {proibidos!r} if m in sys.modules]}}))
+"""
+
+
+# Mede um módulo 'repeticoes' vezes (cada vez em um processo novo) e fica com o menor tempo, o menos afetado por ruído.
+def medir_importacao(modulo: str, repeticoes: int = 3) -> dict:
+    ambiente = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [_PASTA_SRC, os.environ.get('PYTHONPATH')])))
+    medidas = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, '-c', _SCRIPT.format(modulo=modulo, proibidos=PROIBIDOS)],
+                               capture_output=True, text=True, env=ambiente, check=True).stdout
+        medidas.append(json.loads(saida.strip().splitlines()[-1]))
+    melhor = min(medidas, key=lambda m: m['modulo_s'])
+    return {'modulo': modulo, 'tempo_s': melhor['modulo_s'], 'base_pandas_numpy_s': melhor['base_s'],
+            'carregados': ', '.join(melhor['carregados'])}
+
+
+def verificar_orcamento(orcamento_s: float = 0.3, modulos: list = None, repeticoes: int = 3) -> pd.DataFrame:
+    resultados = pd.DataFrame([medir_importacao(m, repeticoes) for m in (modulos or MODULOS)])
+    resultados['dentro_do_orcamento'] = (resultados['tempo_s'] <= orcamento_s) & (resultados['carregados'] == '')
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Orçamento de tempo de importação dos módulos de src/.")
+    parser.add_argument('--orcamento', type=float, default=0.3, help="Segundos permitidos além do 'import pandas, numpy'.")
+    parser.add_argument('--modulos', nargs='+', default=None)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    resultados = verificar_orcamento(args.orcamento, args.modulos, args.repeticoes)
+    print(resultados.to_string(index=False))
+    if not resultados['dentro_do_orcamento'].all():
+        print(f"\nMódulos fora do orçamento de {args.orcamento} s ou importando {', '.join(PROIBIDOS)}:")
+        print(', '.join(resultados.loc[~resultados['dentro_do_orcamento'], 'modulo']))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
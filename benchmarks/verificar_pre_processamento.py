@@ -0,0 +1,83 @@
+# Verifica se o pré-processamento em blocos (executar_pre_processamento_em_blocos) grava o mesmo arquivo que o
+# pré-processamento completo em memória (executar_pre_processamento_completo), com vários tamanhos de bloco, no CSV de
+# exemplo e em um CSV pequeno com nulos, duplicatas e uma coluna que é numérica nos primeiros blocos e texto depois.
+# Sai com código 1 se alguma comparação falhar, para poder ser usado como verificação antes de um merge.
+#
+# Uso: python -m benchmarks.verificar_pre_processamento
+import os
+import io
+import sys
+import argparse
+import tempfile
+import contextlib
+import pandas as pd
+import funcoes_pre_processamento as pp
+
+
+_CSV_EXEMPLO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dados', 'student_habits_performance.csv')
+
+# Coluna 'codigo' com seis '1', um nulo e três 'abc' (com blocos de 5 linhas, o primeiro bloco é todo numérico),
+# nulos em uma quantitativa e uma qualitativa e uma linha repetida.
+_CSV_MISTO = """codigo,grupo,horas,exam_score
+1,x,2.5,50
+1,x,3.0,60
+1,,3.5,70
+1,y,,80
+1,x,4.0,90
+1,x,2.5,55
+,y,3.0,65
+abc,y,3.5,75
+abc,x,4.5,85
+abc,y,5.0,95
+1,x,2.5,50
+"""
+
+
+# Executa os dois caminhos sobre 'caminho_csv' e devolve uma lista com as diferenças encontradas (vazia se forem iguais).
+def comparar(caminho_csv: str, tamanhos_bloco: list, pasta: str) -> list:
+    caminho_completo = os.path.join(pasta, 'completo.csv')
+    with contextlib.redirect_stdout(io.StringIO()):
+        pp.executar_pre_processamento_completo(caminho_csv, caminho_completo)
+    esperado = pd.read_csv(caminho_completo, dtype=str)
+
+    diferencas = []
+    for tamanho_bloco in tamanhos_bloco:
+        caminho_blocos = os.path.join(pasta, f'blocos_{tamanho_bloco}.csv')
+        with contextlib.redirect_stdout(io.StringIO()):
+            pp.executar_pre_processamento_em_blocos(caminho_csv, caminho_blocos, tamanho_bloco=tamanho_bloco)
+        obtido = pd.read_csv(caminho_blocos, dtype=str)
+        try:
+            # Lidos como texto e comparados coluna a coluna; as numéricas com tolerância (a média é somada em outra ordem).
+            pd.testing.assert_index_equal(obtido.columns, esperado.columns)
+            for coluna in esperado.columns:
+                numerica = pd.to_numeric(esperado[coluna], errors='coerce')
+                if numerica.notna().all():
+                    pd.testing.assert_series_equal(pd.to_numeric(obtido[coluna]), numerica, rtol=1e-12)
+                else:
+                    pd.testing.assert_series_equal(obtido[coluna], esperado[coluna])
+        except AssertionError as e:
+            diferencas.append(f"{os.path.basename(caminho_csv)}, blocos de {tamanho_bloco} linhas: {e}")
+    return diferencas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara o pré-processamento em blocos com o completo em memória.")
+    parser.add_argument('--blocos', type=int, nargs='+', default=[100, 333, 1_000_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_misto = os.path.join(pasta, 'misto.csv')
+        with open(caminho_misto, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(_CSV_MISTO)
+        # O CSV misto tem 11 linhas, então também testamos blocos bem pequenos (e a coluna mista em vários pontos).
+        diferencas = comparar(_CSV_EXEMPLO, args.blocos, pasta) + comparar(caminho_misto, [1, 2, 3, 5, 7] + args.blocos, pasta)
+
+    for diferenca in diferencas:
+        print(diferenca)
+    if diferencas:
+        sys.exit(1)
+    print("Pré-processamento em blocos igual ao completo em todos os casos.")
+
+
+if __name__ == '__main__':
+    main()
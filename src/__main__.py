@@ -0,0 +1,166 @@
+# Execução do projeto em lote, sem Jupyter: pré-processamento → análise univariada → bivariada → PCA, com caminhos
+# de entrada e saída explícitos. As tabelas são gravadas em CSV ou Parquet na pasta <saida>/tabelas e, com --figuras,
+# as figuras em PNG na pasta <saida>/figuras. Sem --figuras, nem o seaborn nem o IPython são importados.
+#
+# Uso: python -m src --entrada dados/student_habits_performance.csv --saida resultados/lote --etapas pre uni bi pca --figuras
+import os
+import sys
+import argparse
+import importlib.util
+import numpy as np
+import pandas as pd
+
+# Os módulos de src importam uns aos outros pelo nome (por exemplo, 'import funcoes_analise_uni as au'), como nos
+# notebooks. 'python -m src' carrega este arquivo como src.__main__, então colocamos a pasta src no sys.path antes
+# de importá-los (só aqui, no ponto de entrada, para que cada módulo seja carregado uma única vez, pelo nome).
+_PASTA_SRC = os.path.dirname(os.path.abspath(__file__))
+if _PASTA_SRC not in sys.path:
+    sys.path.insert(0, _PASTA_SRC)
+
+import funcoes_pre_processamento as pp
+import funcoes_analise_uni as au
+import funcoes_analise_bi as ab
+import funcoes_correlacao as fc
+import funcoes_pca as fpca
+import funcoes_instrumentacao as fi
+import funcoes_matriz as fm
+
+
+ETAPAS = ['pre', 'uni', 'bi', 'pca']
+
+
+def _salvar_tabela(tabela: pd.DataFrame, nome: str, pasta: str, formato: str, index: bool = True) -> str:
+    os.makedirs(pasta, exist_ok=True)
+    caminho = os.path.join(pasta, f"{nome}.{formato}")
+    if formato == 'parquet':
+        tabela.to_parquet(caminho, index=index)
+    else:
+        tabela.to_csv(caminho, index=index)
+    print(f"Tabela salva em: {caminho}")
+    return caminho
+
+
+# Com a etapa 'pre', a entrada é o CSV bruto; sem ela, a entrada já é o CSV pré-processado
+# (se faltar a performance_class, ela é criada a partir do exam_score).
+def etapa_pre_processamento(entrada: str, pasta_tabelas: str, formato: str, pre_processar: bool = True) -> pd.DataFrame:
+    df = pp.carregar_dados(entrada)
+    if df is None:
+        return None
+    if pre_processar:
+        df = pp.tratar_dados_faltantes(df)
+        df = pp.remover_duplicatas(df)
+        df = pp.discretizar_variavel_alvo(df)
+        _salvar_tabela(df, 'dados_processados', pasta_tabelas, formato, index=False)
+    elif 'performance_class' not in df.columns:
+        df = pp.discretizar_variavel_alvo(df)
+    return df
+
+# Nas etapas abaixo, com 'matriz' (uma funcoes_matriz.MatrizCaracteristicas) as estatísticas das quantitativas, as
+# correlações e o PCA leem todos a mesma matriz em vez de converter o dataframe de novo em cada etapa.
+def etapa_univariada(df: pd.DataFrame, df_dict: pd.DataFrame, pasta_tabelas: str, formato: str, matriz: fm.MatrizCaracteristicas = None) -> None:
+    quantitativas, qualitativas = au.separar_variaveis(df_dict)
+    fonte = df if matriz is None else matriz
+    _salvar_tabela(au.estatisticas_descritivas_quantitativas(fonte, quantitativas), 'descritivas_quantitativas', pasta_tabelas, formato)
+    qualitativas_tabela = pd.concat(au.estatisticas_descritivas_qualitativas(df, qualitativas), names=['Variável', 'Categoria'])
+    _salvar_tabela(qualitativas_tabela, 'descritivas_qualitativas', pasta_tabelas, formato)
+    _salvar_tabela(au.estatisticas_condicionais_por_classe_especifica(fonte, quantitativas, pp.LABELS_PERFORMANCE),
+                   'condicionais_por_classe', pasta_tabelas, formato, index=False)
+
+def etapa_bivariada(df: pd.DataFrame, df_dict: pd.DataFrame, pasta_tabelas: str, formato: str, matriz: fm.MatrizCaracteristicas = None) -> None:
+    quantitativas, qualitativas = ab.separar_variaveis(df_dict)
+    fonte = df if matriz is None else matriz
+    _salvar_tabela(fc.matriz_correlacao(fonte, quantitativas, 'pearson'), 'correlacao_pearson', pasta_tabelas, formato)
+    _salvar_tabela(fc.matriz_correlacao(fonte, quantitativas, 'spearman'), 'correlacao_spearman', pasta_tabelas, formato)
+    _salvar_tabela(fc.matriz_cramer_v(df, qualitativas), 'cramer_v', pasta_tabelas, formato)
+    _salvar_tabela(fc.estatisticas_qui_quadrado(df, qualitativas), 'qui_quadrado', pasta_tabelas, formato, index=False)
+
+# Com 'pasta_figuras', também desenha a projeção nos dois primeiros componentes com as cargas (agregada em pixels
+# quando há muitas linhas, veja funcoes_pca.renderizar_projecao).
+def etapa_pca(df: pd.DataFrame, df_dict: pd.DataFrame, pasta_tabelas: str, formato: str, n_componentes: int = None,
+              pasta_figuras: str = None, matriz: fm.MatrizCaracteristicas = None) -> fpca.PCA:
+    if matriz is None:
+        colunas_numericas, colunas_categoricas = au.separar_variaveis(df_dict)
+        X, nomes = pp.montar_matriz_preditores(df, colunas_numericas, colunas_categoricas)
+    else:
+        X, nomes = matriz, matriz.colunas_preditoras
+    pca = fpca.PCA(n_componentes=n_componentes).fit(X, nomes)
+    cargas = pca.cargas()
+    componentes = cargas.index
+
+    _salvar_tabela(cargas, 'pca_cargas', pasta_tabelas, formato)
+    _salvar_tabela(pd.DataFrame({
+        'Autovalor': pca.autovalores_,
+        'Variância explicada': pca.razao_variancia_explicada_,
+        'Variância explicada acumulada': np.cumsum(pca.razao_variancia_explicada_)
+    }, index=componentes), 'pca_variancia_explicada', pasta_tabelas, formato)
+    projecao = pd.DataFrame(pca.transform(X), columns=componentes)
+    projecao['performance_class'] = df['performance_class'].astype(str).to_numpy()
+    _salvar_tabela(projecao, 'pca_projecao', pasta_tabelas, formato, index=False)
+    if pasta_figuras is not None and len(componentes) >= 2:
+        import matplotlib.pyplot as plt
+        caminho = os.path.join(pasta_figuras, 'pca_projecao.png')
+        fig = fpca.renderizar_projecao(projecao[componentes], df['performance_class'], cargas, caminho)
+        plt.close(fig)
+        print(f"Figura salva em: {caminho}")
+    return pca
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m src', description="Executa o pré-processamento e as análises em lote, sem Jupyter.")
+    parser.add_argument('--entrada', required=True, help="CSV de entrada (bruto com a etapa 'pre'; já pré-processado sem ela).")
+    parser.add_argument('--saida', default='resultados/lote', help="Pasta de saída (tabelas/ e figuras/ são criadas dentro dela).")
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS, default=ETAPAS, help="Etapas a executar (padrão: todas).")
+    parser.add_argument('--formato', choices=['csv', 'parquet'], default='csv', help="Formato das tabelas (parquet requer o pyarrow).")
+    parser.add_argument('--figuras', action='store_true', help="Também gera as figuras das análises univariada e bivariada e a projeção do PCA em PNG.")
+    parser.add_argument('--processos', type=int, default=None, help="Processos usados nas figuras (padrão: todos os núcleos; 1 = sem pool).")
+    parser.add_argument('--componentes', type=int, default=None, help="Número de componentes do PCA (padrão: todos).")
+    parser.add_argument('--matriz', choices=['float32', 'float64'], default=None,
+                        help="Grava a matriz de características em <saida>/matriz (.npy) e a usa, por memmap, nas etapas uni, bi e pca.")
+    parser.add_argument('--instrumentacao', default=None, help="Grava os tempos de cada função neste arquivo JSON.")
+    args = parser.parse_args(argv)
+    # Verificado antes de qualquer etapa, para não perder o pré-processamento por um ImportError na primeira tabela.
+    if args.formato == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+        parser.error("--formato parquet requer o pyarrow (pip install pyarrow); use --formato csv.")
+
+    pasta_tabelas = os.path.join(args.saida, 'tabelas')
+    pasta_figuras = os.path.join(args.saida, 'figuras')
+    if args.instrumentacao:
+        fi.ativar_instrumentacao()
+    if args.figuras:
+        import matplotlib.pyplot as plt
+        plt.switch_backend('Agg')
+
+    df = etapa_pre_processamento(args.entrada, pasta_tabelas, args.formato, pre_processar='pre' in args.etapas)
+    if df is None:
+        return 1
+    df_dict = pp.obter_dicionario_de_dados()
+    matriz = None
+    if args.matriz:
+        matriz = fm.montar_matriz_caracteristicas(df, os.path.join(args.saida, 'matriz'), dtype=np.dtype(args.matriz), df_dict=df_dict)
+
+    if 'uni' in args.etapas:
+        etapa_univariada(df, df_dict, pasta_tabelas, args.formato, matriz)
+    if 'bi' in args.etapas:
+        etapa_bivariada(df, df_dict, pasta_tabelas, args.formato, matriz)
+    if 'pca' in args.etapas:
+        etapa_pca(df, df_dict, pasta_tabelas, args.formato, args.componentes, pasta_figuras if args.figuras else None, matriz)
+
+    if args.figuras:
+        import funcoes_renderizacao as fr
+
+        tarefas = []
+        if 'uni' in args.etapas:
+            tarefas += fr.tarefas_univariadas(df, df_dict)
+        if 'bi' in args.etapas:
+            tarefas += fr.tarefas_bivariadas(df_dict)
+        if tarefas:
+            tempos = fr.renderizar_figuras(df, tarefas, pasta_figuras, args.processos)
+            _salvar_tabela(tempos, 'tempos_figuras', pasta_tabelas, args.formato, index=False)
+
+    if args.instrumentacao:
+        fi.exportar_instrumentacao(args.instrumentacao)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,12 +2,13 @@ import os
 import math
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import funcoes_analise_uni as au
+import funcoes_correlacao as fc
+from funcoes_instrumentacao import instrumentar, salvar_figura
 
 
 # Função destinada a separar as variáveis em qualitativas e quantitativas, permitindo a análise bivariada adequada.
+@instrumentar
 def separar_variaveis(df_dict: pd.DataFrame) -> tuple:
     quantitativas, qualitativas = au.separar_variaveis(df_dict)
     quantitativas.append('exam_score')
@@ -15,7 +16,26 @@ def separar_variaveis(df_dict: pd.DataFrame) -> tuple:
     return quantitativas, qualitativas
 
 # Função para comparar variáveis quantitativas com scatter plots coloridos por 'performance_class'.
-def comparar_quantitativas(df, quantitativas: list, figuras: str) -> None:
+# O 'modo' controla como os pontos são desenhados: 'pontos' desenha todas as linhas, 'amostra' desenha uma amostra
+# estratificada por performance_class com até 'limite_linhas' linhas e 'densidade' desenha um histograma 2D por par.
+# No modo 'auto' usamos 'pontos' até 'limite_linhas' linhas e 'amostra' acima disso, para o tempo de desenho não crescer com N.
+@instrumentar
+def comparar_quantitativas(df, quantitativas: list, figuras: str, modo: str = 'auto', limite_linhas: int = 5_000, n_bins: int = 60) -> None:
+    import matplotlib.pyplot as plt
+
+    fig = construir_comparacao_quantitativas(df, quantitativas, modo, limite_linhas, n_bins)
+    if fig is not None:
+        salvar_figura(f"{figuras}/bivariada_quantxquant_colorida.png", bbox_inches='tight')
+        plt.show()
+
+# As funções 'construir_*' montam e devolvem a figura sem salvar nem mostrar, para que o módulo funcoes_renderizacao
+# possa gerá-las em paralelo e direto em disco.
+@instrumentar
+def construir_comparacao_quantitativas(df, quantitativas: list, modo: str = 'auto', limite_linhas: int = 5_000, n_bins: int = 60) -> 'plt.Figure':
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+    import seaborn as sns
+
     pares_quant = [(quantitativas[i], quantitativas[j]) 
                    for i in range(len(quantitativas)) 
                    for j in range(i+1, len(quantitativas))]
@@ -23,11 +43,28 @@ def comparar_quantitativas(df, quantitativas: list, figuras: str) -> None:
     n_cols = 3
     n_rows = math.ceil(len(pares_quant) / n_cols)
     
-    if pares_quant:
-        fig, subs = plt.subplots(n_rows, n_cols, figsize=(5 * n_cols, 4 * n_rows))
-        subs = subs.flatten()
-        
-        for idx, (x_col, y_col) in enumerate(pares_quant):
+    if not pares_quant:
+        return None
+
+    if modo == 'auto':
+        modo = 'pontos' if len(df) <= limite_linhas else 'amostra'
+    if modo == 'amostra':
+        df = amostra_estratificada(df, 'performance_class', limite_linhas)
+    elif modo == 'densidade':
+        # Os índices dos bins de cada coluna são calculados uma vez e reaproveitados em todos os pares.
+        bordas, indices, validos = _discretizar_colunas(df, quantitativas, n_bins)
+    elif modo != 'pontos':
+        raise ValueError(f"Modo desconhecido: '{modo}'. Use 'auto', 'pontos', 'amostra' ou 'densidade'.")
+
+    fig, subs = plt.subplots(n_rows, n_cols, figsize=(5 * n_cols, 4 * n_rows))
+    subs = subs.flatten()
+    
+    for idx, (x_col, y_col) in enumerate(pares_quant):
+        if modo == 'densidade':
+            contagens = _histograma_2d(indices[x_col], indices[y_col], validos[x_col] & validos[y_col], n_bins)
+            subs[idx].pcolormesh(bordas[x_col], bordas[y_col], np.ma.masked_equal(contagens.T, 0),
+                                 cmap='viridis', norm=LogNorm())
+        else:
             sns.scatterplot(
                 data=df,
                 x=x_col, y=y_col,
@@ -36,39 +73,122 @@ def comparar_quantitativas(df, quantitativas: list, figuras: str) -> None:
                 ax=subs[idx],
                 alpha=0.7, edgecolor='none'
             )
-            subs[idx].set_title(f'{x_col} vs {y_col}')
-            subs[idx].set_xlabel(x_col)
-            subs[idx].set_ylabel(y_col)
             subs[idx].legend().set_title('Performance')
-        
-        for idx in range(len(pares_quant), n_rows * n_cols):
-            fig.delaxes(subs[idx])
-        
+        subs[idx].set_title(f'{x_col} vs {y_col}')
+        subs[idx].set_xlabel(x_col)
+        subs[idx].set_ylabel(y_col)
+    
+    for idx in range(len(pares_quant), n_rows * n_cols):
+        fig.delaxes(subs[idx])
+    
+    if modo == 'densidade':
+        plt.suptitle('Bivariada Incondicional - Quantitativa x Quantitativa (Densidade, escala log)', fontsize=15, y=1.02)
+    else:
         plt.suptitle('Bivariada Incondicional - Quantitativa x Quantitativa (Colorido por performance_class)', fontsize=15, y=1.02)
-        plt.tight_layout()
-        plt.savefig(f"{figuras}/bivariada_quantxquant_colorida.png", bbox_inches='tight')
-        plt.show()
+    plt.tight_layout()
+    return fig
+
+# Amostra de até 'n_max' linhas mantendo a proporção de cada classe de 'coluna_classe'.
+@instrumentar
+def amostra_estratificada(df: pd.DataFrame, coluna_classe: str, n_max: int, semente: int = 0) -> pd.DataFrame:
+    if len(df) <= n_max:
+        return df
+    return df.groupby(coluna_classe, observed=True, group_keys=False).sample(frac=n_max / len(df), random_state=semente)
+
+# Para cada coluna: as bordas dos 'n_bins' bins entre o mínimo e o máximo, o índice do bin de cada linha e a máscara de valores válidos.
+def _discretizar_colunas(df: pd.DataFrame, colunas: list, n_bins: int) -> tuple:
+    bordas, indices, validos = {}, {}, {}
+    for coluna in colunas:
+        x = df[coluna].to_numpy(dtype=np.float64, na_value=np.nan)
+        valido = ~np.isnan(x)
+        minimo, maximo = (x[valido].min(), x[valido].max()) if valido.any() else (0.0, 1.0)
+        if maximo == minimo:
+            maximo = minimo + 1.0
+        bordas[coluna] = np.linspace(minimo, maximo, n_bins + 1)
+        indice = np.floor((np.where(valido, x, minimo) - minimo) / (maximo - minimo) * n_bins)
+        indices[coluna] = np.clip(indice, 0, n_bins - 1).astype(np.int32)
+        validos[coluna] = valido
+    return bordas, indices, validos
+
+# Histograma 2D de um par a partir dos índices já calculados: um único 'bincount' sobre o índice combinado.
+def _histograma_2d(indice_x: np.ndarray, indice_y: np.ndarray, validos: np.ndarray, n_bins: int) -> np.ndarray:
+    combinado = indice_x[validos].astype(np.int64) * n_bins + indice_y[validos]
+    return np.bincount(combinado, minlength=n_bins * n_bins).reshape(n_bins, n_bins)
 
 # Função para gerar um heatmap de correlação entre variáveis quantitativas.
-def heatmap_quantitativas(df, quantitativas: list, figuras: str) -> None:
-    corr = df[quantitativas].corr(method='pearson')
-    plt.figure(figsize=(12, 10))
+# Se a matriz de correlação já tiver sido calculada (funcoes_correlacao.matriz_correlacao), ela pode ser passada em 'corr'
+# para ser reaproveitada em vez de recalculada.
+@instrumentar
+def heatmap_quantitativas(df, quantitativas: list, figuras: str, corr: pd.DataFrame = None) -> None:
+    import matplotlib.pyplot as plt
+
+    construir_heatmap_quantitativas(df, quantitativas, corr)
+    salvar_figura(f"{figuras}/heatmap_global_quantxquant.png", bbox_inches='tight')
+    plt.show()
+
+@instrumentar
+def construir_heatmap_quantitativas(df, quantitativas: list, corr: pd.DataFrame = None) -> 'plt.Figure':
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    if corr is None:
+        corr = fc.matriz_correlacao(df, quantitativas, metodo='pearson')
+    fig = plt.figure(figsize=(12, 10))
     sns.heatmap(corr, annot=True, cmap='coolwarm', fmt=".2f")
     plt.title("Correlação entre Variáveis Quantitativas (Heatmap Global)", fontsize=16)
     plt.tight_layout()
-    plt.savefig(f"{figuras}/heatmap_global_quantxquant.png", bbox_inches='tight')
+    return fig
+
+# Heatmap do V de Cramér entre as variáveis qualitativas, o equivalente da correlação para os pares de comparar_qualitativas.
+@instrumentar
+def heatmap_qualitativas(df, qualitativas: list, figuras: str, matriz: pd.DataFrame = None) -> None:
+    import matplotlib.pyplot as plt
+
+    construir_heatmap_qualitativas(df, qualitativas, matriz)
+    salvar_figura(f"{figuras}/heatmap_cramer_v_qualxqual.png", bbox_inches='tight')
     plt.show()
 
+@instrumentar
+def construir_heatmap_qualitativas(df, qualitativas: list, matriz: pd.DataFrame = None) -> 'plt.Figure':
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    if matriz is None:
+        matriz = fc.matriz_cramer_v(df, qualitativas)
+    fig = plt.figure(figsize=(10, 8))
+    sns.heatmap(matriz, annot=True, cmap='YlOrRd', fmt=".2f", vmin=0, vmax=1)
+    plt.title("Associação entre Variáveis Qualitativas (V de Cramér)", fontsize=16)
+    plt.tight_layout()
+    return fig
+
 # Função para comparar variáveis qualitativas com heatmaps de tabelas cruzadas.
+@instrumentar
 def comparar_qualitativas(df, qualitativas: list, figuras: str) -> None:
-    # Cria todos os pares possíveis
+    import matplotlib.pyplot as plt
+
+    construir_qualitativas_sem_perf(df, qualitativas)
+    salvar_figura(f"{figuras}/bivariada_qualxqual_sem_perf.png", bbox_inches='tight')
+    plt.show()
+
+    construir_qualitativas_vs_performance(df, qualitativas)
+    salvar_figura(f"{figuras}/qualitativa_vs_performance.png", bbox_inches='tight')
+    plt.show()
+
+# Cria todos os pares possíveis e separa os pares com performance_class e sem.
+def _pares_qualitativos(qualitativas: list) -> tuple:
     pares_qual = [(qualitativas[i], qualitativas[j]) 
                   for i in range(len(qualitativas)) 
                   for j in range(i+1, len(qualitativas))]
-
-    # Separa pares com performance_class e sem
     pares_com_perf = [p for p in pares_qual if 'performance_class' in p]
     pares_sem_perf = [p for p in pares_qual if 'performance_class' not in p]
+    return pares_com_perf, pares_sem_perf
+
+@instrumentar
+def construir_qualitativas_sem_perf(df, qualitativas: list) -> 'plt.Figure':
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    _, pares_sem_perf = _pares_qualitativos(qualitativas)
 
     n_cols = 3
 
@@ -76,8 +196,10 @@ def comparar_qualitativas(df, qualitativas: list, figuras: str) -> None:
     fig, subs = plt.subplots(n_rows, n_cols, figsize=(5 * n_cols, 4 * n_rows))
     subs = subs.flatten()
         
+    # Todas as tabelas cruzadas saem de uma vez do motor de contingência (códigos inteiros + bincount).
+    tabelas = fc.tabelas_contingencia(df, qualitativas, pares_sem_perf)
     for idx, (col1, col2) in enumerate(pares_sem_perf):
-        crosstab = pd.crosstab(df[col1], df[col2])
+        crosstab = tabelas[(col1, col2)]
         sns.heatmap(crosstab, annot=True, fmt='d', cmap='YlOrRd', ax=subs[idx])
         subs[idx].set_title(f'{col1} vs {col2}')
         
@@ -87,24 +209,28 @@ def comparar_qualitativas(df, qualitativas: list, figuras: str) -> None:
         
     plt.suptitle('Bivariada - Qualitativa x Qualitativa', fontsize=15, y=1.02)
     plt.tight_layout()
-    plt.savefig(f"{figuras}/{"bivariada_qualxqual_sem_perf"}.png", bbox_inches='tight')
-    plt.show()
+    return fig
+
+# Função auxiliar para plotar histogramas empilhados de performance_class
+@instrumentar
+def construir_qualitativas_vs_performance(df, qualitativas: list) -> 'plt.Figure':
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
-    # Função auxiliar para plotar histogramas empilhados de performance_class
+    pares_com_perf, _ = _pares_qualitativos(qualitativas)
+
+    n_cols = 3
     n_rows = math.ceil(len(pares_com_perf) / n_cols)
     fig, subs = plt.subplots(n_rows, n_cols, figsize=(5 * n_cols, 4 * n_rows))
     subs = subs.flatten()
 
-    for idx, (col1, col2) in enumerate(pares_com_perf):
-        # Determina a variável qualitativa que não é performance_class
-        qual_col = col1 if col2 == 'performance_class' else col2
-        prop_df = (
-            df.groupby([qual_col, 'performance_class'])
-                .size()
-              .groupby(level=0)
-              .apply(lambda x: x / x.sum())
-              .unstack(fill_value=0)
-        )
+    # Determina a variável qualitativa que não é performance_class em cada par
+    pares_orientados = [(col1 if col2 == 'performance_class' else col2, 'performance_class') for col1, col2 in pares_com_perf]
+    tabelas = fc.tabelas_contingencia(df, qualitativas, pares_orientados)
+
+    for idx, (qual_col, _) in enumerate(pares_orientados):
+        # Proporção de cada classe de desempenho dentro de cada categoria (divisão de arrays em vez de apply por grupo).
+        prop_df = fc.proporcoes_por_linha(tabelas[(qual_col, 'performance_class')])
         prop_df.plot(
             kind='bar',
             stacked=True,
@@ -122,5 +248,4 @@ def comparar_qualitativas(df, qualitativas: list, figuras: str) -> None:
 
     plt.suptitle('Qualitativa x performance_class', fontsize=15, y=1.02)
     plt.tight_layout()
-    plt.savefig(f"{figuras}/{"qualitativa_vs_performance"}.png", bbox_inches='tight')
-    plt.show()
+    return fig
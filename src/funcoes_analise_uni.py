@@ -1,103 +1,20 @@
 # Neste arquivo temos funções reutilizáveis para análise univariada incondicional e condicionada por classe
+# As estatísticas ficam no funcoes_nucleo (só pandas e NumPy) e são reexportadas aqui; o matplotlib e o seaborn
+# só são importados dentro das funções que desenham.
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import skew
 import math
-from IPython.display import display
+from funcoes_nucleo import (separar_variaveis, estatisticas_descritivas_quantitativas, estatisticas_descritivas_quantitativas_em_blocos,
+                            estatisticas_descritivas_qualitativas, estatisticas_condicionais_por_classe_especifica)
+from funcoes_instrumentacao import instrumentar
 
 
-# Esta função irá separar nossas variáveis entre quantitativas e qualitativas,
-# ela tem como argumento o dataframe que contém o dicionário de dados e retorna uma tupla (nesse caso, duas listas).
-def separar_variaveis(df_dict: pd.DataFrame) -> tuple:
-    
-    # Usamos o dataframe do dicionário (df_dict) feito no pré processamento para criar
-    # uma máscara booleana onde iremos filtrar as linhas onde o 'tipo' seja 'quantitativo' e depois pegue
-    # só a coluna 'variavel' dessas linhas filtradas e converta elas para uma lista python com a função 'tolist()'
-    # jogando tudo isso numa variável 'quantitativa', fazemos o mesmo processo para as variáveis que têm tipo.
-    quantitativas = df_dict[df_dict['tipo'] == 'quantitativa']['variavel'].tolist()
-    qualitativas = df_dict[df_dict['tipo'] == 'qualitativa']['variavel'].tolist()
-
-
-    # Aqui, tiramos as variáveis que não serão usadas na análise univariada, ou seja, a que não contribui como preditor (student_id), 
-    # a nossa variável alvo (exam_score) e a que será usada na análise condicional(perfomance_class). 
-    if 'student_id' in qualitativas:
-        qualitativas.remove('student_id')
-
-    if 'exam_score' in quantitativas:
-        quantitativas.remove('exam_score')
-     
-    if 'performance_class' in qualitativas:
-        qualitativas.remove('performance_class')
-        
-    # Por fim, retornamos a tupla contendo duas listas de variáveis, a quantitativa e a qualitativa.   
-    return quantitativas, qualitativas
-
-# Esta função irá fazer alguns cálculos utlizando as funções da biblioteca do pandas nas colunas do dataframe que indicarmos como parâmetro.
-def estatisticas_descritivas_quantitativas(df: pd.DataFrame, colunas: list) -> pd.DataFrame:
-     
-     # Vamos usar a função agg da pandas para realizar 1-contagem dos valores, 2-encontrar o mínimo, 3-encontrar o máximo,4-calcular a média, 5-calcular a mediana,
-     # 6-calcular o desvio padrão, 7-calcular a skewness (assimetria). Depois, usa o .T pra transpostar a coluna pra uma linha para deixar mais agradável aos olhos.
-     estatisticas = df[colunas].agg(['count', 'min', 'max', 'mean', 'median', 'std', 'skew']).T
-
-    # Mudando os nomes para português:
-     estatisticas.columns = ['Contagem', 'Mínimo', 'Máximo', 'Média', 'Mediana', 'Desvio Padrão', 'Assimetria']
-
-    #Por fim, retornamos essas estatísticas:
-     return estatisticas 
-
-# Esta função irá fazer algo parecido com a da anterior só que dessa vez será com as variáveis qualitativas.
-# Usaremos como parâmetros a tabela completa (df) e uma lista com os nomes das colunas qualitativas que queremos ver(colunas), retornando um dicionário(dict) jpa que cada coluna tem categorias diferentes, então não retornaremos um dataframe como na função anterior.
-def estatisticas_descritivas_qualitativas(df: pd.DataFrame, colunas: list) -> dict:
-     
-     resultados = {} # Dicionário vazio
-     
-     # col vai passar pelas colunas do dataframe e a função value_conts vai contar cada valor único.
-     # o normalize true vai nos dar frações entre 0 e 1 e depois passar pra porcentagem com o *100 pra termos nossas medidas diferentes padronizadas e normalizadas em forma de fração. É uma forma de discretizar as nossas variáveis categóricas (qualitativas.
-     for col in colunas:
-        contagem = df[col].value_counts()
-        proporcao = df[col].value_counts(normalize=True) * 100
-        df_temp = pd.DataFrame({
-            'Contagem': contagem,
-            'Proporção (%)': proporcao
-        })
-        resultados[col] = df_temp
-     
-     #Ao final teremos um dicionário de dataframes onde cada dataframe tem uma contagem e uma proporção, e cada dataframe está associado a uma coluna que veio do parâmetro da função.
-     return resultados
-
-#  Aqui vamos calcular estatísticas descritivas (média, desvio padrão e assimetria) para cada variável quantitativa para cada classe de desempenho.
-def estatisticas_condicionais_por_classe_especifica(df: pd.DataFrame, colunas_quantitativas: list, classes: list, coluna_classe: str = 'performance_class') -> pd.DataFrame:
-    resultados = []
-    
-    # Para cada variável quantitativa.
-    for var in colunas_quantitativas:
-        # Para cada classe ESPECÍFICA fornecida no parâmetro.
-        for classe in classes:
-            # Filtra os dados para a classe específica.
-            dados_classe = df[df[coluna_classe] == classe][var].dropna()
-            
-            # Calcula as estatísticas.
-            n_obs = len(dados_classe)
-            media = dados_classe.mean()
-            desvio_padrao = dados_classe.std()
-            assimetria = dados_classe.skew()
-            
-            # Adiciona ao resultado.
-            resultados.append({
-                'Variável': var,
-                'Classe': classe,
-                'N_observações': n_obs,
-                'Média': media,
-                'Desvio_Padrão': desvio_padrao,
-                'Assimetria': assimetria
-            })
-    
-    return pd.DataFrame(resultados)
-
 #Esta função vai plotar vários gráficos para vermos de uma vez.
-def plot_matriz_univariada_quantitativa(df: pd.DataFrame, colunas: list) -> None:
+# As funções 'construir_*' só montam a figura e a devolvem, sem mostrar; assim a mesma figura pode ser exibida no notebook
+# (pelas funções 'plot_*') ou salva direto em disco pelo módulo funcoes_renderizacao, inclusive em paralelo.
+@instrumentar
+def construir_matriz_univariada_quantitativa(df: pd.DataFrame, colunas: list) -> 'plt.Figure':
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     
     n_vars = len(colunas) 
     n_plots = n_vars * 2 # Cada variável quantitativa tem 1 histograma e 1 boxplot, logo o número de plots é vezes 2.
@@ -132,10 +49,20 @@ def plot_matriz_univariada_quantitativa(df: pd.DataFrame, colunas: list) -> None
     # Por fim, plotando:
     plt.suptitle ('Análise Univariada Incondicional - Variáveis Quantitativas (Histograma e Boxplot)', fontsize=16, y=1.02)
     plt.tight_layout()
+    return fig
+
+@instrumentar
+def plot_matriz_univariada_quantitativa(df: pd.DataFrame, colunas: list) -> None:
+    import matplotlib.pyplot as plt
+
+    construir_matriz_univariada_quantitativa(df, colunas)
     plt.show()
             
 # Agora vamos fazer a função de plot de matriz das qualitativas:
-def plot_matriz_univariada_qualitativa(df: pd.DataFrame, colunas: list) -> None:
+@instrumentar
+def construir_matriz_univariada_qualitativa(df: pd.DataFrame, colunas: list) -> 'plt.Figure':
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     
     # A lógica aqui vai ser parecida com a da função anterior, só que gerando gráficos de barras para as variáveis qualitativas.
 
@@ -166,10 +93,19 @@ def plot_matriz_univariada_qualitativa(df: pd.DataFrame, colunas: list) -> None:
     #Por fim plotando:    
     plt.suptitle('Análise Univariada Incondicional - Variáveis Qualitativas (Gráfico de Barras)', fontsize=16, y=1.02)
     plt.tight_layout()
+    return fig
+
+@instrumentar
+def plot_matriz_univariada_qualitativa(df: pd.DataFrame, colunas: list) -> None:
+    import matplotlib.pyplot as plt
+
+    construir_matriz_univariada_qualitativa(df, colunas)
     plt.show()
 
 # Agora vamos implementar as funções da análise univariada condicional (às categorias reprovado, recuperação, bom e excelente)  
+@instrumentar
 def plot_matriz_condicional_quantitativa(df: pd.DataFrame, colunas_quant: list, coluna_alvo: str) -> None: # Aqui passamos como parâmetro o nome da coluna alvo como a perfomance_class.
+    import matplotlib.pyplot as plt
 
     #Vamos mudar um pouco da lógica feita nas incondicionais devido a quantidade de gráficos que irão aparecer aqui, se usassemos o flatten() ficaria muito confuso,
     # já que a gente perderia a noção visual por linha e coluna então é melhor uma outra abordagem:
@@ -178,37 +114,52 @@ def plot_matriz_condicional_quantitativa(df: pd.DataFrame, colunas_quant: list,
     classes = list(df[coluna_alvo].dropna().unique())
 
     for coluna in colunas_quant:
-        # Cria a figura de 1 linha para boxplot e 1 linha pra histogramas.
-        fig = plt.figure(figsize=(16, 8))
-            
-        # Boxplots.
-        subs1 = plt.subplot2grid((2, len(classes)), (0, 0), colspan=len(classes))
-        sns.boxplot(x=coluna_alvo, y=coluna, data=df, ax=subs1, order=classes)
-        subs1.set_title(f'{coluna} por {coluna_alvo}')
-        subs1.set_xlabel(coluna_alvo)
-        subs1.set_ylabel(coluna)
-
-        # Histogramas.
-        for i, classe in enumerate(classes):
-            subs = plt.subplot2grid((2, len(classes)), (1, i))  # Função que permite o posicionamento preciso.
-            subset = df[df[coluna_alvo] == classe][coluna].dropna()
-            if subset.empty:
-                # evita erro se não houver dados para uma classe
-                subs.set_visible(False)
-                continue
-            subs.hist(subset, bins=10, density=True)
-            sns.kdeplot(subset, ax=subs)
-            subs.set_title(f'{coluna} - {classe}')
-            subs.set_xlabel(coluna)
-            subs.set_ylabel('Densidade')
-
-        plt.suptitle(f'Análise Condicional - {coluna}', fontsize=14, y=1.02)
-        plt.tight_layout()
+        fig = construir_figura_condicional_quantitativa(df, coluna, coluna_alvo, classes)
         plt.show()
         plt.close(fig)
 
+# Figura de uma única variável quantitativa: boxplot por classe na primeira linha e um histograma por classe na segunda.
+@instrumentar
+def construir_figura_condicional_quantitativa(df: pd.DataFrame, coluna: str, coluna_alvo: str, classes: list = None) -> 'plt.Figure':
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    if classes is None:
+        classes = list(df[coluna_alvo].dropna().unique())
+
+    # Cria a figura de 1 linha para boxplot e 1 linha pra histogramas.
+    fig = plt.figure(figsize=(16, 8))
+        
+    # Boxplots.
+    subs1 = plt.subplot2grid((2, len(classes)), (0, 0), colspan=len(classes))
+    sns.boxplot(x=coluna_alvo, y=coluna, data=df, ax=subs1, order=classes)
+    subs1.set_title(f'{coluna} por {coluna_alvo}')
+    subs1.set_xlabel(coluna_alvo)
+    subs1.set_ylabel(coluna)
+
+    # Histogramas.
+    for i, classe in enumerate(classes):
+        subs = plt.subplot2grid((2, len(classes)), (1, i))  # Função que permite o posicionamento preciso.
+        subset = df[df[coluna_alvo] == classe][coluna].dropna()
+        if subset.empty:
+            # evita erro se não houver dados para uma classe
+            subs.set_visible(False)
+            continue
+        subs.hist(subset, bins=10, density=True)
+        sns.kdeplot(subset, ax=subs)
+        subs.set_title(f'{coluna} - {classe}')
+        subs.set_xlabel(coluna)
+        subs.set_ylabel('Densidade')
+
+    plt.suptitle(f'Análise Condicional - {coluna}', fontsize=14, y=1.02)
+    plt.tight_layout()
+    return fig
+
 # Agora a qualitativa condicional:
-def plot_matriz_condicional_qualitativa(df: pd.DataFrame, colunas_qual: list, coluna_alvo: str) -> None:
+@instrumentar
+def construir_matriz_condicional_qualitativa(df: pd.DataFrame, colunas_qual: list, coluna_alvo: str) -> 'plt.Figure':
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     
     n_vars = len(colunas_qual)
     n_plots = n_vars
@@ -236,11 +187,20 @@ def plot_matriz_condicional_qualitativa(df: pd.DataFrame, colunas_qual: list, co
         
     plt.suptitle(f'Análise Univariada Condicional - Qualitativas vs {coluna_alvo}', fontsize=16, y=1.02)
     plt.tight_layout()
+    return fig
+
+@instrumentar
+def plot_matriz_condicional_qualitativa(df: pd.DataFrame, colunas_qual: list, coluna_alvo: str) -> None:
+    import matplotlib.pyplot as plt
+
+    construir_matriz_condicional_qualitativa(df, colunas_qual, coluna_alvo)
     plt.show()
 
 # Esta função vai realizar a análise univariada incondicional e condicional, separando as variáveis, calculando as estatísticas e plotando as matrizes de gráficos desta análise.
 # Recebe como parâmetros o dataframe processados, o dicionário de dados e o nome da variável alvo pra análise condicional caso você queira ver tudo de uma vez.
+@instrumentar
 def executar_analise_univariada_completa(df: pd.DataFrame, df_dict: pd.DataFrame, coluna_alvo: str = 'performance_class') -> None:
+    from IPython.display import display
 
     quantitativas, qualitativas = separar_variaveis(df_dict)
     
@@ -0,0 +1,203 @@
+# Neste arquivo temos um cache em disco para os resultados das análises, para que os notebooks não recalculem tudo
+# a cada execução. A chave de cada resultado é um hash do conteúdo dos argumentos (dados, listas de colunas e, nos
+# argumentos declarados como arquivos de entrada, o conteúdo do arquivo) e do código-fonte do módulo da função e dos
+# módulos da mesma pasta que ele importa (direta ou indiretamente, inclusive dentro de funções): qualquer mudança no
+# CSV, nos parâmetros ou no código (por exemplo, nas faixas de discretização ou em um esboço de funcoes_esbocos usado
+# por funcoes_nucleo) gera uma chave nova. Caminhos de saída entram só como texto, para que o arquivo gravado pela
+# própria função não mude a chave. Quando a pasta passa do tamanho máximo, os resultados usados há mais tempo são
+# apagados primeiro (LRU).
+import os
+import ast
+import pickle
+import hashlib
+import inspect
+import functools
+import numpy as np
+import pandas as pd
+import funcoes_pre_processamento as pp
+import funcoes_analise_uni as au
+import funcoes_correlacao as fc
+import funcoes_pca as fpca
+from funcoes_matriz import MatrizCaracteristicas
+
+
+class CacheResultados:
+
+    def __init__(self, pasta: str, tamanho_maximo_bytes: int = 1 << 30):
+        self.pasta = pasta
+        self.tamanho_maximo_bytes = tamanho_maximo_bytes
+        # Hash de arquivos já lidos nesta sessão, indexado por (caminho, tamanho, data de modificação).
+        self._hashes_arquivos = {}
+        # Módulos da mesma pasta importados por cada arquivo-fonte, indexado do mesmo jeito.
+        self._importacoes = {}
+
+    # Decorador: 'cache.memorizar(funcao)' devolve uma versão da função que consulta o cache antes de calcular.
+    # Efeitos colaterais da função (como o CSV salvo pelo pré-processamento) só acontecem quando ela é executada de fato.
+    # 'entradas' lista os nomes dos argumentos que são caminhos de arquivos lidos pela função; só esses entram na
+    # chave pelo conteúdo do arquivo.
+    def memorizar(self, funcao, entradas: list = None):
+        entradas = list(entradas or [])
+
+        @functools.wraps(funcao)
+        def memorizada(*args, **kwargs):
+            caminho = os.path.join(self.pasta, f"{self.chave(funcao, args, kwargs, entradas)}.pkl")
+            if os.path.exists(caminho):
+                with open(caminho, 'rb') as f:
+                    resultado = pickle.load(f)
+                os.utime(caminho)  # Marca como usado agora, para a ordem do LRU.
+                return resultado
+
+            resultado = funcao(*args, **kwargs)
+            os.makedirs(self.pasta, exist_ok=True)
+            temporario = f"{caminho}.{os.getpid()}.tmp"
+            with open(temporario, 'wb') as f:
+                pickle.dump(resultado, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, caminho)
+            self._aplicar_limite()
+            return resultado
+        return memorizada
+
+    def chave(self, funcao, args: tuple, kwargs: dict, entradas: list = ()) -> str:
+        h = hashlib.sha256()
+        h.update(f"{funcao.__module__}.{funcao.__qualname__}".encode())
+        # 'unwrap' passa por decoradores (como o da instrumentação) até a função original e o seu módulo.
+        original = inspect.unwrap(funcao)
+        try:
+            arquivo_fonte = inspect.getsourcefile(original)
+        except TypeError:  # Funções embutidas (em C) não têm arquivo-fonte.
+            arquivo_fonte = None
+        if arquivo_fonte is not None and os.path.isfile(arquivo_fonte):
+            for dependencia in self._dependencias(arquivo_fonte):
+                h.update(self._hash_arquivo(dependencia).encode())
+        elif hasattr(original, '__code__'):
+            # Funções definidas no terminal ou com exec ('<stdin>', '<string>') não têm arquivo: usamos o bytecode.
+            h.update(original.__code__.co_code)
+            h.update(repr(original.__code__.co_consts).encode())
+
+        # Os argumentos entram pelo nome (com os valores padrão preenchidos), então f(x) e f(x, padrao) têm a mesma chave.
+        try:
+            ligados = inspect.signature(funcao).bind(*args, **kwargs)
+            ligados.apply_defaults()
+            itens = sorted(ligados.arguments.items())
+        except (TypeError, ValueError):
+            itens = [(str(i), valor) for i, valor in enumerate(args)] + sorted(kwargs.items())
+        for nome, valor in itens:
+            h.update(nome.encode())
+            if nome in entradas and isinstance(valor, str) and os.path.isfile(valor):
+                # Arquivos de entrada entram pelo conteúdo: se o CSV mudar, a chave muda.
+                h.update(self._hash_arquivo(valor).encode())
+            else:
+                self._atualizar_hash(h, valor)
+        return h.hexdigest()
+
+    # Objetos sem tratamento próprio caem no pickle, então matrizes grandes (como a MatrizCaracteristicas, que pode ser
+    # um memmap) são tratadas pelas suas partes: arrays pelos bytes, sem serializar o objeto inteiro.
+    def _atualizar_hash(self, h, valor) -> None:
+        h.update(type(valor).__name__.encode())
+        if isinstance(valor, MatrizCaracteristicas):
+            self._atualizar_hash(h, [valor.colunas, valor.metadados.get('colunas_alvo', []), valor.classes, valor.valores, valor.codigos])
+        elif isinstance(valor, pp.MatrizPreditoresMista):
+            self._atualizar_hash(h, [valor.numericas, valor.dummies])
+        elif fpca._eh_esparsa(valor):
+            valor = valor.tocsr()
+            self._atualizar_hash(h, [valor.shape, valor.data, valor.indices, valor.indptr])
+        elif isinstance(valor, pd.DataFrame):
+            h.update(repr(list(valor.columns)).encode())
+            h.update(repr(list(valor.dtypes.astype(str))).encode())
+            h.update(pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes())
+        elif isinstance(valor, pd.Series):
+            h.update(repr((valor.name, str(valor.dtype))).encode())
+            h.update(pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes())
+        elif isinstance(valor, np.ndarray):
+            # Uma matriz em ordem Fortran (como a MatrizCaracteristicas) entra pela transposta, que já é contígua,
+            # em vez de ser copiada para a ordem C.
+            fortran = valor.flags.f_contiguous and not valor.flags.c_contiguous
+            h.update(repr((valor.shape, str(valor.dtype), fortran)).encode())
+            h.update(memoryview(valor.T if fortran else np.ascontiguousarray(valor)).cast('B'))
+        elif isinstance(valor, (list, tuple)):
+            for item in valor:
+                self._atualizar_hash(h, item)
+        elif isinstance(valor, dict):
+            self._atualizar_hash(h, sorted(valor.items(), key=lambda item: repr(item[0])))
+        elif valor is None or isinstance(valor, (str, int, float, bool, np.generic)):
+            h.update(repr(valor).encode())
+        else:
+            h.update(pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+
+    # O próprio arquivo e todos os módulos da mesma pasta que ele importa, direta ou indiretamente (lidos da árvore
+    # sintática, então importações dentro de funções também contam), em ordem alfabética.
+    def _dependencias(self, arquivo_fonte: str) -> list:
+        pasta = os.path.dirname(os.path.abspath(arquivo_fonte))
+        encontrados, pendentes = set(), [os.path.abspath(arquivo_fonte)]
+        while pendentes:
+            arquivo = pendentes.pop()
+            if arquivo in encontrados:
+                continue
+            encontrados.add(arquivo)
+            for nome in self._modulos_importados(arquivo):
+                caminho = os.path.join(pasta, f"{nome}.py")
+                if os.path.isfile(caminho):
+                    pendentes.append(caminho)
+        return sorted(encontrados)
+
+    def _modulos_importados(self, caminho: str) -> set:
+        info = os.stat(caminho)
+        identificador = (caminho, info.st_size, info.st_mtime_ns)
+        if identificador not in self._importacoes:
+            with open(caminho, 'rb') as f:
+                arvore = ast.parse(f.read(), filename=caminho)
+            nomes = set()
+            for no in ast.walk(arvore):
+                if isinstance(no, ast.Import):
+                    nomes.update(alias.name for alias in no.names)
+                elif isinstance(no, ast.ImportFrom) and no.module is not None and no.level == 0:
+                    nomes.add(no.module)
+            self._importacoes[identificador] = nomes
+        return self._importacoes[identificador]
+
+    def _hash_arquivo(self, caminho: str) -> str:
+        info = os.stat(caminho)
+        identificador = (os.path.abspath(caminho), info.st_size, info.st_mtime_ns)
+        if identificador not in self._hashes_arquivos:
+            h = hashlib.sha256()
+            with open(caminho, 'rb') as f:
+                for bloco in iter(lambda: f.read(1 << 20), b''):
+                    h.update(bloco)
+            self._hashes_arquivos[identificador] = h.hexdigest()
+        return self._hashes_arquivos[identificador]
+
+    # Apaga os resultados usados há mais tempo até a pasta caber em 'tamanho_maximo_bytes'.
+    def _aplicar_limite(self) -> None:
+        arquivos = []
+        for nome in os.listdir(self.pasta):
+            if nome.endswith('.pkl'):
+                info = os.stat(os.path.join(self.pasta, nome))
+                arquivos.append((info.st_mtime, info.st_size, nome))
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, nome in sorted(arquivos):
+            if total <= self.tamanho_maximo_bytes:
+                break
+            os.remove(os.path.join(self.pasta, nome))
+            total -= tamanho
+
+    def tamanho_atual(self) -> int:
+        if not os.path.isdir(self.pasta):
+            return 0
+        return sum(os.path.getsize(os.path.join(self.pasta, nome)) for nome in os.listdir(self.pasta) if nome.endswith('.pkl'))
+
+    def limpar(self) -> None:
+        if os.path.isdir(self.pasta):
+            for nome in os.listdir(self.pasta):
+                if nome.endswith('.pkl'):
+                    os.remove(os.path.join(self.pasta, nome))
+
+
+# Cache padrão, na pasta .cache_resultados na raiz do projeto, e as versões memorizadas das etapas mais caras.
+cache_padrao = CacheResultados(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache_resultados"))
+
+executar_pre_processamento_completo = cache_padrao.memorizar(pp.executar_pre_processamento_completo, entradas=['caminho_ou_url'])
+estatisticas_descritivas_quantitativas = cache_padrao.memorizar(au.estatisticas_descritivas_quantitativas)
+estatisticas_descritivas_qualitativas = cache_padrao.memorizar(au.estatisticas_descritivas_qualitativas)
+estatisticas_condicionais_por_classe_especifica = cache_padrao.memorizar(au.estatisticas_condicionais_por_classe_especifica)
+matriz_correlacao = cache_padrao.memorizar(fc.matriz_correlacao)
+ajustar_pca = cache_padrao.memorizar(fpca.ajustar_pca)
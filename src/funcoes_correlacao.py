@@ -0,0 +1,168 @@
+# Neste arquivo temos o cálculo das matrizes de associação usadas na análise bivariada:
+# correlação de Pearson e de Spearman entre as quantitativas e V de Cramér entre as qualitativas.
+import numpy as np
+import pandas as pd
+from funcoes_matriz import MatrizCaracteristicas
+
+
+# Acumulador da matriz de covariância por blocos de linhas. Guardamos a contagem, a média e a matriz de co-momentos
+# (soma dos produtos dos desvios) e juntamos blocos com a fórmula de Chan, então os dados podem vir aos poucos
+# (de um CSV lido em blocos, por exemplo) ou de vários processos, que depois são combinados com 'mesclar'.
+class AcumuladorCorrelacao:
+
+    def __init__(self, n_colunas: int, dtype=np.float64):
+        self.dtype = dtype
+        self.n = 0
+        self.media = np.zeros(n_colunas)
+        self.comomentos = np.zeros((n_colunas, n_colunas))
+
+    # Linhas com algum NaN são descartadas (o pandas, em 'corr', descarta por par de colunas).
+    def atualizar(self, bloco) -> 'AcumuladorCorrelacao':
+        x = np.asarray(bloco, dtype=np.float64)
+        x = x[~np.isnan(x).any(axis=1)]
+        if len(x) == 0:
+            return self
+        outro = AcumuladorCorrelacao(x.shape[1], self.dtype)
+        outro.n = len(x)
+        outro.media = x.mean(axis=0)
+        # O produto X̃ᵀX̃ do bloco centrado pode ser feito em float32 para economizar memória e tempo.
+        centrado = (x - outro.media).astype(self.dtype, copy=False)
+        outro.comomentos = (centrado.T @ centrado).astype(np.float64)
+        return self.mesclar(outro)
+
+    def mesclar(self, outro: 'AcumuladorCorrelacao') -> 'AcumuladorCorrelacao':
+        n = self.n + outro.n
+        if n == 0:
+            return self
+        delta = outro.media - self.media
+        self.comomentos = self.comomentos + outro.comomentos + np.outer(delta, delta) * (self.n * outro.n / n)
+        self.media = self.media + delta * (outro.n / n)
+        self.n = n
+        return self
+
+    def covariancia(self) -> np.ndarray:
+        return self.comomentos / (self.n - 1)
+
+    # Correlação = covariância dividida pelo produto dos desvios padrão, ou seja, X̃ᵀX̃/(n−1) com X̃ padronizado.
+    def correlacao(self) -> np.ndarray:
+        desvio = np.sqrt(np.diag(self.comomentos))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = self.comomentos / np.outer(desvio, desvio)
+        np.fill_diagonal(corr, np.where(desvio > 0, 1.0, np.nan))
+        return np.clip(corr, -1, 1)
+
+
+# Matriz de correlação entre 'colunas' com o método 'pearson' ou 'spearman'. O Spearman é o Pearson dos postos
+# (média dos postos nos empates), então basta uma transformação de postos antes do mesmo cálculo.
+# 'tamanho_bloco' limita quantas linhas entram em cada produto matricial. 'df' também pode ser uma MatrizCaracteristicas:
+# no Pearson os blocos de linhas são lidos direto dela e convertidos para float64 um bloco por vez.
+# Com valores ausentes, o resultado é o mesmo de 'df[colunas].corr()': cada par de colunas usa as linhas em que as duas
+# estão preenchidas (o acumulador descartaria a linha inteira), então nesse caso o cálculo fica com o pandas.
+def matriz_correlacao(df: pd.DataFrame, colunas: list, metodo: str = 'pearson', tamanho_bloco: int = 1_000_000, dtype=np.float64) -> pd.DataFrame:
+    if metodo not in ('pearson', 'spearman'):
+        raise ValueError(f"Método desconhecido: '{metodo}'. Use 'pearson' ou 'spearman'.")
+    eh_matriz = isinstance(df, MatrizCaracteristicas)
+    valores = df.selecionar(colunas) if eh_matriz else df[colunas].to_numpy(dtype=np.float64, na_value=np.nan)
+    if any(np.isnan(valores[inicio:inicio + tamanho_bloco]).any() for inicio in range(0, len(valores), tamanho_bloco)):
+        dados = df.para_dataframe(colunas) if eh_matriz else df[colunas]
+        return dados.corr(method=metodo)
+
+    if metodo == 'spearman' and eh_matriz:
+        valores = np.column_stack([pd.Series(df.coluna(c), dtype=np.float64).rank().to_numpy() for c in colunas]) if colunas else np.empty((len(df), 0))
+    elif metodo == 'spearman':
+        valores = df[colunas].rank().to_numpy(dtype=np.float64)
+
+    acumulador = AcumuladorCorrelacao(len(colunas), dtype)
+    for inicio in range(0, len(valores), tamanho_bloco):
+        acumulador.atualizar(valores[inicio:inicio + tamanho_bloco])
+    return pd.DataFrame(acumulador.correlacao(), index=colunas, columns=colunas)
+
+# Correlação de Pearson lendo o CSV em blocos, para arquivos que não cabem na memória.
+# (O Spearman precisa dos postos globais de cada coluna e por isso não é calculado em blocos.)
+def matriz_correlacao_em_blocos(caminho_ou_url: str, colunas: list, tamanho_bloco: int = 100_000, dtype=np.float64) -> pd.DataFrame:
+    acumulador = AcumuladorCorrelacao(len(colunas), dtype)
+    for bloco in pd.read_csv(caminho_ou_url, usecols=colunas, chunksize=tamanho_bloco):
+        acumulador.atualizar(bloco[colunas].to_numpy(dtype=np.float64, na_value=np.nan))
+    return pd.DataFrame(acumulador.correlacao(), index=colunas, columns=colunas)
+
+
+# Estatística qui-quadrado de independência de uma tabela de contingência (linhas e colunas vazias são ignoradas).
+def qui_quadrado(tabela) -> float:
+    observado = np.asarray(tabela, dtype=np.float64)
+    observado = observado[observado.sum(axis=1) > 0][:, observado.sum(axis=0) > 0]
+    esperado = np.outer(observado.sum(axis=1), observado.sum(axis=0)) / observado.sum()
+    return float(((observado - esperado) ** 2 / esperado).sum())
+
+# V de Cramér: sqrt(χ² / (n · (min(linhas, colunas) − 1))), entre 0 (independência) e 1 (associação perfeita).
+def cramer_v(tabela) -> float:
+    observado = np.asarray(tabela, dtype=np.float64)
+    k = min((observado.sum(axis=1) > 0).sum(), (observado.sum(axis=0) > 0).sum())
+    if k < 2:
+        return np.nan
+    return float(np.sqrt(qui_quadrado(observado) / (observado.sum() * (k - 1))))
+
+# Converte cada coluna qualitativa em códigos inteiros uma única vez (-1 para valores ausentes).
+# Colunas 'category' mantêm a ordem das categorias; as demais usam a ordem alfabética, como o 'pd.crosstab'.
+def codificar_qualitativas(df: pd.DataFrame, colunas: list) -> tuple:
+    codigos, categorias = {}, {}
+    for coluna in colunas:
+        if isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            codigos[coluna] = df[coluna].cat.codes.to_numpy()
+            categorias[coluna] = df[coluna].cat.categories
+        else:
+            codigos[coluna], categorias[coluna] = pd.factorize(df[coluna], sort=True)
+    return codigos, categorias
+
+# Tabela de contingência de um par a partir dos códigos: um 'bincount' sobre o código combinado (código1 · k2 + código2).
+# Linhas e colunas sem nenhuma observação são descartadas, como no 'pd.crosstab'.
+def _tabela_por_codigos(codigo1: np.ndarray, categorias1, codigo2: np.ndarray, categorias2) -> pd.DataFrame:
+    validos = (codigo1 >= 0) & (codigo2 >= 0)
+    k1, k2 = len(categorias1), len(categorias2)
+    combinado = codigo1[validos].astype(np.int64) * k2 + codigo2[validos]
+    contagens = np.bincount(combinado, minlength=k1 * k2).reshape(k1, k2)
+    linhas = contagens.sum(axis=1) > 0
+    colunas = contagens.sum(axis=0) > 0
+    return pd.DataFrame(contagens[linhas][:, colunas],
+                        index=pd.Index(categorias1[linhas], name=categorias1.name),
+                        columns=pd.Index(categorias2[colunas], name=categorias2.name))
+
+# Tabelas de contingência de vários pares de uma vez (por padrão, todos os pares de 'colunas'), em um dicionário
+# {(coluna1, coluna2): tabela}. As colunas são codificadas uma única vez e reaproveitadas em todos os pares.
+def tabelas_contingencia(df: pd.DataFrame, colunas: list, pares: list = None) -> dict:
+    if pares is None:
+        pares = [(colunas[i], colunas[j]) for i in range(len(colunas)) for j in range(i + 1, len(colunas))]
+    codigos, categorias = codificar_qualitativas(df, list(dict.fromkeys(c for par in pares for c in par)))
+    for coluna in categorias:
+        categorias[coluna] = pd.Index(categorias[coluna], name=coluna)
+    return {(c1, c2): _tabela_por_codigos(codigos[c1], categorias[c1], codigos[c2], categorias[c2]) for c1, c2 in pares}
+
+# Proporção de cada célula em relação ao total da sua linha (divisão direta dos arrays).
+def proporcoes_por_linha(tabela: pd.DataFrame) -> pd.DataFrame:
+    valores = tabela.to_numpy(dtype=np.float64)
+    return pd.DataFrame(valores / valores.sum(axis=1, keepdims=True), index=tabela.index, columns=tabela.columns)
+
+# Teste qui-quadrado de independência para cada par de variáveis qualitativas: estatística, graus de liberdade,
+# p-valor e V de Cramér, em uma tabela com uma linha por par.
+def estatisticas_qui_quadrado(df: pd.DataFrame, qualitativas: list, pares: list = None) -> pd.DataFrame:
+    from scipy.stats import chi2
+
+    resultados = []
+    for (c1, c2), tabela in tabelas_contingencia(df, qualitativas, pares).items():
+        estatistica = qui_quadrado(tabela)
+        graus = (tabela.shape[0] - 1) * (tabela.shape[1] - 1)
+        resultados.append({
+            'Variável 1': c1,
+            'Variável 2': c2,
+            'Qui-quadrado': estatistica,
+            'Graus de liberdade': graus,
+            'p-valor': chi2.sf(estatistica, graus) if graus > 0 else np.nan,
+            'V de Cramér': cramer_v(tabela)
+        })
+    return pd.DataFrame(resultados)
+
+# Matriz simétrica com o V de Cramér de cada par de variáveis qualitativas.
+def matriz_cramer_v(df: pd.DataFrame, qualitativas: list) -> pd.DataFrame:
+    matriz = pd.DataFrame(np.eye(len(qualitativas)), index=qualitativas, columns=qualitativas)
+    for (c1, c2), tabela in tabelas_contingencia(df, qualitativas).items():
+        matriz.loc[c1, c2] = matriz.loc[c2, c1] = cramer_v(tabela)
+    return matriz
@@ -0,0 +1,159 @@
+# Neste arquivo temos "esboços" (sketches) de estatísticas descritivas: estruturas pequenas que podem ser atualizadas
+# bloco a bloco e mescladas entre si, para calcular estatísticas de arquivos maiores que a memória ou em vários processos.
+import numpy as np
+import pandas as pd
+
+
+# Esboço de quantis de uma coluna: guardamos pares (valor, peso) ordenados pelo valor.
+# Enquanto o número de valores distintos couber em 'max_centroides' o esboço é exato (é só uma contagem de valores);
+# quando passa disso, agrupamos valores vizinhos em centroides de peso parecido e o quantil passa a ser aproximado.
+class EsbocoQuantis:
+
+    def __init__(self, max_centroides: int = 2048):
+        self.max_centroides = max_centroides
+        self.valores = np.empty(0, dtype=np.float64)
+        self.pesos = np.empty(0, dtype=np.float64)
+        self.exato = True
+
+    # Acrescenta os valores de um bloco (NaN são ignorados).
+    def atualizar(self, x) -> 'EsbocoQuantis':
+        x = np.asarray(x, dtype=np.float64)
+        x = x[~np.isnan(x)]
+        valores, contagens = np.unique(x, return_counts=True)
+        self._combinar(valores, contagens.astype(np.float64))
+        return self
+
+    # Junta outro esboço a este (por exemplo, o resultado de outro processo ou de outra partição do arquivo).
+    def mesclar(self, outro: 'EsbocoQuantis') -> 'EsbocoQuantis':
+        self.exato = self.exato and outro.exato
+        self._combinar(outro.valores, outro.pesos)
+        return self
+
+    def _combinar(self, valores: np.ndarray, pesos: np.ndarray) -> None:
+        todos = np.concatenate([self.valores, valores])
+        unicos, inverso = np.unique(todos, return_inverse=True)
+        self.valores = unicos
+        self.pesos = np.bincount(inverso, weights=np.concatenate([self.pesos, pesos]), minlength=len(unicos))
+        if len(self.valores) > self.max_centroides:
+            self._comprimir()
+
+    # Agrupa os centroides em 'max_centroides' faixas de peso (massa) parecido, usando a média ponderada de cada faixa.
+    def _comprimir(self) -> None:
+        acumulado = np.cumsum(self.pesos)
+        faixa = np.floor((acumulado - self.pesos / 2) / acumulado[-1] * self.max_centroides).astype(np.int64)
+        pesos = np.bincount(faixa, weights=self.pesos)
+        somas = np.bincount(faixa, weights=self.pesos * self.valores)
+        usados = pesos > 0
+        self.valores = somas[usados] / pesos[usados]
+        self.pesos = pesos[usados]
+        self.exato = False
+
+    @property
+    def contagem(self) -> float:
+        return float(self.pesos.sum())
+
+    # Quantil com interpolação linear entre as posições vizinhas, como o 'quantile' padrão do pandas.
+    def quantil(self, q: float) -> float:
+        n = self.contagem
+        if n == 0:
+            return np.nan
+        acumulado = np.cumsum(self.pesos)
+        posicao = (n - 1) * q
+        baixo = np.floor(posicao)
+        v_baixo, v_alto = self.valores[np.searchsorted(acumulado, [baixo, baixo + 1], side='right').clip(max=len(self.valores) - 1)]
+        return float(v_baixo + (v_alto - v_baixo) * (posicao - baixo))
+
+
+# Esboço dos momentos de várias colunas ao mesmo tempo: contagem, mínimo, máximo, média, M2 e M3
+# (somas dos desvios em relação à média elevados ao quadrado e ao cubo). Blocos e esboços são combinados
+# pelas fórmulas de Welford/Chan, que não precisam revisitar os dados.
+class EsbocoMomentos:
+
+    def __init__(self, n_colunas: int):
+        self.n = np.zeros(n_colunas)
+        self.minimo = np.full(n_colunas, np.inf)
+        self.maximo = np.full(n_colunas, -np.inf)
+        self.media = np.zeros(n_colunas)
+        self.m2 = np.zeros(n_colunas)
+        self.m3 = np.zeros(n_colunas)
+
+    # 'bloco' é uma matriz linhas x colunas; NaN são ignorados coluna a coluna.
+    def atualizar(self, bloco) -> 'EsbocoMomentos':
+        x = np.asarray(bloco, dtype=np.float64).reshape(len(bloco), -1)
+        validos = ~np.isnan(x)
+        n = validos.sum(axis=0).astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            media = np.where(validos, x, 0).sum(axis=0) / n
+            desvio = np.where(validos, x - media, 0)
+        outro = EsbocoMomentos(x.shape[1])
+        outro.n = n
+        outro.minimo = np.where(validos, x, np.inf).min(axis=0, initial=np.inf)
+        outro.maximo = np.where(validos, x, -np.inf).max(axis=0, initial=-np.inf)
+        outro.media = np.where(n > 0, media, 0)
+        outro.m2 = (desvio ** 2).sum(axis=0)
+        outro.m3 = (desvio ** 3).sum(axis=0)
+        return self.mesclar(outro)
+
+    def mesclar(self, outro: 'EsbocoMomentos') -> 'EsbocoMomentos':
+        na, nb = self.n, outro.n
+        n = na + nb
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta = outro.media - self.media
+            media = self.media + delta * np.where(n > 0, nb / n, 0)
+            m2 = self.m2 + outro.m2 + np.where(n > 0, delta ** 2 * na * nb / n, 0)
+            m3 = (self.m3 + outro.m3
+                  + np.where(n > 0, delta ** 3 * na * nb * (na - nb) / n ** 2, 0)
+                  + np.where(n > 0, 3 * delta * (na * outro.m2 - nb * self.m2) / n, 0))
+        self.n, self.media, self.m2, self.m3 = n, media, m2, m3
+        self.minimo = np.minimum(self.minimo, outro.minimo)
+        self.maximo = np.maximum(self.maximo, outro.maximo)
+        return self
+
+    # Desvio padrão amostral (ddof=1) e assimetria ajustada, com as mesmas fórmulas do pandas.
+    def desvio_padrao(self) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.n > 1, np.sqrt(self.m2 / (self.n - 1)), np.nan)
+
+    def assimetria(self) -> np.ndarray:
+        n = self.n
+        m2 = np.where(np.abs(self.m2) < 1e-14, 0, self.m2)
+        m3 = np.where(np.abs(self.m3) < 1e-14, 0, self.m3)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            resultado = (n * (n - 1) ** 0.5 / (n - 2)) * (m3 / m2 ** 1.5)
+        resultado = np.where(m2 == 0, 0, resultado)
+        return np.where(n < 3, np.nan, resultado)
+
+
+# Junta os dois esboços acima para reproduzir a tabela de 'estatisticas_descritivas_quantitativas'.
+class EsbocoEstatisticasDescritivas:
+
+    def __init__(self, colunas: list, max_centroides: int = 2048):
+        self.colunas = list(colunas)
+        self.momentos = EsbocoMomentos(len(self.colunas))
+        self.quantis = [EsbocoQuantis(max_centroides) for _ in self.colunas]
+
+    def atualizar(self, df_bloco: pd.DataFrame) -> 'EsbocoEstatisticasDescritivas':
+        x = df_bloco[self.colunas].to_numpy(dtype=np.float64, na_value=np.nan)
+        self.momentos.atualizar(x)
+        for j, esboco in enumerate(self.quantis):
+            esboco.atualizar(x[:, j])
+        return self
+
+    def mesclar(self, outro: 'EsbocoEstatisticasDescritivas') -> 'EsbocoEstatisticasDescritivas':
+        self.momentos.mesclar(outro.momentos)
+        for esboco, esboco_outro in zip(self.quantis, outro.quantis):
+            esboco.mesclar(esboco_outro)
+        return self
+
+    def tabela(self) -> pd.DataFrame:
+        m = self.momentos
+        vazio = m.n == 0
+        return pd.DataFrame({
+            'Contagem': m.n,
+            'Mínimo': np.where(vazio, np.nan, m.minimo),
+            'Máximo': np.where(vazio, np.nan, m.maximo),
+            'Média': np.where(vazio, np.nan, m.media),
+            'Mediana': [esboco.quantil(0.5) for esboco in self.quantis],
+            'Desvio Padrão': m.desvio_padrao(),
+            'Assimetria': m.assimetria()
+        }, index=self.colunas)
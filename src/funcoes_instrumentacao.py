@@ -0,0 +1,166 @@
+# Neste arquivo temos a instrumentação opcional das funções do projeto: quando ativada, cada chamada das funções
+# públicas de pré-processamento, análise univariada, bivariada e PCA registra o tempo de parede, o tempo de CPU,
+# o número de linhas processadas e a variação de memória, e o tempo gasto salvando cada figura.
+# Desativada (o padrão), o custo é só um teste de uma variável global por chamada.
+#
+# Uso:
+#     import funcoes_instrumentacao as fi
+#     fi.ativar_instrumentacao()                 # ou a variável de ambiente HW1_INSTRUMENTACAO=1
+#     ... roda as análises ...
+#     fi.relatorio_instrumentacao()              # tabela resumida por função
+#     fi.exportar_instrumentacao("tempos.json")  # registros completos em JSON
+import os
+import io
+import json
+import time
+import pstats
+import cProfile
+import functools
+import resource
+import tracemalloc
+import contextlib
+import pandas as pd
+
+
+_ativo = os.environ.get('HW1_INSTRUMENTACAO', '') not in ('', '0')
+_perfil = False
+_memoria = False
+_profundidade = 0
+_registros = []
+_perfis = {}
+# Pico de alocação de cada chamada aberta (a mais interna no fim). O 'reset_peak' de uma chamada interna apagaria o
+# pico da externa, então antes de cada reset o pico atual é guardado na chamada que estava aberta.
+_picos = []
+
+
+# Liga a instrumentação. Com 'perfil', a chamada mais externa de cada função instrumentada roda sob o cProfile e o
+# resumo fica em 'perfis()'; com 'memoria', o tracemalloc mede o pico de alocação de cada chamada (mais lento).
+def ativar_instrumentacao(perfil: bool = False, memoria: bool = False) -> None:
+    global _ativo, _perfil, _memoria
+    _ativo, _perfil, _memoria = True, perfil, memoria
+
+def desativar_instrumentacao() -> None:
+    global _ativo, _perfil, _memoria
+    _ativo, _perfil, _memoria = False, False, False
+    _picos.clear()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def limpar_registros() -> None:
+    _registros.clear()
+    _perfis.clear()
+
+
+# Decorador aplicado às funções públicas dos módulos de src/.
+def instrumentar(funcao):
+    nome = f"{funcao.__module__}.{funcao.__qualname__}"
+
+    @functools.wraps(funcao)
+    def instrumentada(*args, **kwargs):
+        if not _ativo:
+            return funcao(*args, **kwargs)
+        with medir(nome, linhas=_contar_linhas(args, kwargs)):
+            return funcao(*args, **kwargs)
+    return instrumentada
+
+
+# Mede um trecho qualquer de código (por exemplo, 'with medir("salvar_figura:biplot"):').
+@contextlib.contextmanager
+def medir(nome: str, linhas: int = None):
+    global _profundidade
+    if not _ativo:
+        yield
+        return
+
+    perfilador = None
+    if _perfil and _profundidade == 0:
+        perfilador = cProfile.Profile()
+    if _memoria:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if _picos:
+            _picos[-1] = max(_picos[-1], tracemalloc.get_traced_memory()[1])
+        _picos.append(0)
+        tracemalloc.reset_peak()
+
+    rss_inicial = _rss_atual()
+    cpu_inicial = time.process_time()
+    inicio = time.perf_counter()
+    _profundidade += 1
+    if perfilador is not None:
+        perfilador.enable()
+    try:
+        yield
+    finally:
+        if perfilador is not None:
+            perfilador.disable()
+        _profundidade -= 1
+        registro = {
+            'funcao': nome,
+            'nivel': _profundidade,
+            'linhas': linhas,
+            'tempo_parede_s': time.perf_counter() - inicio,
+            'tempo_cpu_s': time.process_time() - cpu_inicial,
+            'delta_memoria_mb': (_rss_atual() - rss_inicial) / 2**20,
+        }
+        if _memoria and _picos:
+            pico = max(_picos.pop(), tracemalloc.get_traced_memory()[1])
+            if _picos:
+                _picos[-1] = max(_picos[-1], pico)
+            registro['pico_alocacao_mb'] = pico / 2**20
+        _registros.append(registro)
+        if perfilador is not None:
+            saida = io.StringIO()
+            pstats.Stats(perfilador, stream=saida).sort_stats('cumulative').print_stats(25)
+            _perfis.setdefault(nome, []).append(saida.getvalue())
+
+
+# Salva a figura medindo o tempo de gravação (é onde o matplotlib costuma gastar mais em relatórios grandes).
+def salvar_figura(caminho: str, fig=None, **kwargs) -> None:
+    import matplotlib.pyplot as plt
+
+    with medir(f"salvar_figura:{os.path.basename(caminho)}"):
+        (fig if fig is not None else plt.gcf()).savefig(caminho, **kwargs)
+
+
+# Tabela resumida por função (ou a lista completa de chamadas, com agrupar=False).
+def relatorio_instrumentacao(agrupar: bool = True) -> pd.DataFrame:
+    registros = pd.DataFrame(_registros)
+    if registros.empty or not agrupar:
+        return registros
+    resumo = registros.groupby('funcao').agg(
+        chamadas=('tempo_parede_s', 'size'),
+        tempo_parede_total_s=('tempo_parede_s', 'sum'),
+        tempo_parede_medio_s=('tempo_parede_s', 'mean'),
+        tempo_cpu_total_s=('tempo_cpu_s', 'sum'),
+        linhas_total=('linhas', 'sum'),
+        delta_memoria_max_mb=('delta_memoria_mb', 'max'),
+    )
+    return resumo.sort_values('tempo_parede_total_s', ascending=False)
+
+# Grava os registros (e os perfis do cProfile, se houver) em JSON.
+def exportar_instrumentacao(caminho: str) -> None:
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump({'registros': _registros, 'perfis': _perfis}, f, ensure_ascii=False, indent=2)
+    print(f"Instrumentação salva em: {caminho}")
+
+def perfis() -> dict:
+    return dict(_perfis)
+
+
+# Número de linhas do primeiro argumento que seja um dataframe, array ou matriz esparsa (None se não houver).
+def _contar_linhas(args: tuple, kwargs: dict):
+    for valor in list(args) + list(kwargs.values()):
+        forma = getattr(valor, 'shape', None)
+        if isinstance(forma, tuple) and len(forma) >= 1:
+            return int(forma[0])
+    return None
+
+# Memória residente atual em bytes (no Linux, pelo /proc; nos outros sistemas, o pico do processo).
+def _rss_atual() -> int:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if os.uname().sysname == 'Darwin' else pico * 1024
@@ -0,0 +1,163 @@
+# Neste arquivo temos a matriz de características compartilhada pelas etapas de análise. Em vez de cada etapa extrair
+# df[colunas] e converter para float64 por conta própria, o pré-processamento pode gravar uma única matriz contígua por
+# coluna (ordem Fortran, float32 ou float64) com as quantitativas e as dummies das qualitativas, mais os códigos da
+# classe de desempenho, em arquivos .npy. Ao carregar com memmap, todas as etapas leem o mesmo buffer sem cópias:
+# cada coluna é uma fatia contígua do arquivo e blocos de linhas viram visões, não conversões.
+#
+# Arquivos na pasta: valores.npy (n_linhas x n_colunas), codigos.npy (int8, -1 = sem classe) e metadados.json
+# (nomes das colunas com variável de origem, tipo, subtipo e descrição vindos do dicionário de dados, classes e dtype).
+import os
+import json
+import numpy as np
+import pandas as pd
+from funcoes_instrumentacao import instrumentar
+
+
+class MatrizCaracteristicas:
+
+    def __init__(self, valores: np.ndarray, colunas: list, codigos: np.ndarray = None, classes: list = None, metadados: dict = None):
+        self.valores = valores
+        self.colunas = list(colunas)
+        self.codigos = codigos
+        self.classes = list(classes) if classes is not None else []
+        self.metadados = metadados or {}
+        self._posicoes = {coluna: j for j, coluna in enumerate(self.colunas)}
+
+    # Todas as colunas menos as da variável alvo (as primeiras da matriz, então 'selecionar' devolve uma visão).
+    @property
+    def colunas_preditoras(self) -> list:
+        alvo = set(self.metadados.get('colunas_alvo', []))
+        return [coluna for coluna in self.colunas if coluna not in alvo]
+
+    def __len__(self) -> int:
+        return self.valores.shape[0]
+
+    @property
+    def shape(self) -> tuple:
+        return self.valores.shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.valores.dtype
+
+    def _posicao(self, nome: str) -> int:
+        if nome not in self._posicoes:
+            raise KeyError(f"Coluna '{nome}' não está na matriz de características.")
+        return self._posicoes[nome]
+
+    # Uma coluna como vetor contíguo (visão do memmap, sem cópia).
+    def coluna(self, nome: str) -> np.ndarray:
+        return self.valores[:, self._posicao(nome)]
+
+    # Submatriz com as colunas pedidas, na ordem pedida. Se elas forem consecutivas na matriz, é uma visão;
+    # senão, uma cópia só dessas colunas (ainda em ordem Fortran).
+    def selecionar(self, colunas: list) -> np.ndarray:
+        posicoes = [self._posicao(c) for c in colunas]
+        if len(posicoes) > 0 and posicoes == list(range(posicoes[0], posicoes[0] + len(posicoes))):
+            return self.valores[:, posicoes[0]:posicoes[0] + len(posicoes)]
+        return np.asfortranarray(self.valores[:, posicoes])
+
+    # Códigos da classe na ordem de 'classes' (-1 para linhas sem classe ou de classes fora da lista), como os de
+    # pd.Categorical(df[coluna_classe], categories=classes).codes.
+    def codigos_para(self, classes: list) -> np.ndarray:
+        if self.codigos is None:
+            raise ValueError("A matriz de características foi montada sem a coluna de classe.")
+        classes = list(classes)
+        tabela = np.array([classes.index(c) if c in classes else -1 for c in self.classes] + [-1], dtype=np.int64)
+        return tabela[self.codigos]
+
+    # Dataframe com as colunas pedidas (cópia em float64), para as funções que ainda precisam do pandas.
+    def para_dataframe(self, colunas: list = None) -> pd.DataFrame:
+        colunas = self.colunas if colunas is None else list(colunas)
+        return pd.DataFrame(self.selecionar(colunas).astype(np.float64), columns=colunas)
+
+
+# Monta a matriz de características a partir do dataframe pré-processado: as variáveis quantitativas do dicionário
+# de dados (ou 'colunas_numericas') seguidas das dummies das qualitativas ('colunas_categoricas'), com os mesmos nomes
+# e a mesma ordem de funcoes_pre_processamento.montar_matriz_preditores, então 'PCA().fit(matriz)', que usa só as
+# 'colunas_preditoras', dá o mesmo PCA. As 'colunas_alvo' (o exam_score, usado na análise bivariada) vão no fim da matriz.
+# Com 'pasta', os arquivos são gravados coluna a coluna direto no .npy (sem montar a matriz inteira em float64 na
+# memória) e a matriz devolvida já é o memmap do arquivo; sem 'pasta', a matriz fica só na memória.
+@instrumentar
+def montar_matriz_caracteristicas(df: pd.DataFrame, pasta: str = None, colunas_numericas: list = None, colunas_categoricas: list = None,
+                                  colunas_alvo: list = None, coluna_classe: str = 'performance_class', dtype=np.float32,
+                                  df_dict: pd.DataFrame = None) -> MatrizCaracteristicas:
+    import funcoes_pre_processamento as pp
+    from funcoes_nucleo import separar_variaveis
+
+    df_dict = pp.obter_dicionario_de_dados() if df_dict is None else df_dict
+    if colunas_numericas is None or colunas_categoricas is None:
+        quantitativas, qualitativas = separar_variaveis(df_dict)
+        colunas_numericas = quantitativas if colunas_numericas is None else colunas_numericas
+        colunas_categoricas = qualitativas if colunas_categoricas is None else colunas_categoricas
+    if colunas_alvo is None:
+        colunas_alvo = [c for c in ['exam_score'] if c in df.columns and c not in colunas_numericas]
+
+    # Códigos de cada qualitativa na ordem do get_dummies (categorias ordenadas; a primeira é descartada).
+    fontes = [(coluna, coluna, None) for coluna in colunas_numericas]
+    for coluna in colunas_categoricas:
+        codigos, categorias = pd.factorize(df[coluna], sort=True)
+        fontes += [(f"{coluna}_{categoria}", coluna, (codigos, k)) for k, categoria in enumerate(categorias) if k > 0]
+    fontes += [(coluna, coluna, None) for coluna in colunas_alvo]
+    colunas = [nome for nome, _, _ in fontes]
+
+    if pasta is not None:
+        os.makedirs(pasta, exist_ok=True)
+        valores = np.lib.format.open_memmap(os.path.join(pasta, 'valores.npy'), mode='w+', dtype=dtype,
+                                            shape=(len(df), len(colunas)), fortran_order=True)
+    else:
+        valores = np.empty((len(df), len(colunas)), dtype=dtype, order='F')
+    for j, (_, origem, dummy) in enumerate(fontes):
+        if dummy is None:
+            valores[:, j] = df[origem].to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            valores[:, j] = dummy[0] == dummy[1]
+
+    codigos, classes = None, []
+    if coluna_classe is not None and coluna_classe in df.columns:
+        categorico = pd.Categorical(df[coluna_classe])
+        classes = [c.item() if hasattr(c, 'item') else c for c in categorico.categories]
+        codigos = categorico.codes.astype(np.int8 if len(classes) < 127 else np.int32)
+
+    descricoes = df_dict.set_index('variavel')
+    metadados = {
+        'n_linhas': len(df),
+        'dtype': np.dtype(dtype).str,
+        'coluna_classe': coluna_classe if codigos is not None else None,
+        'classes': classes,
+        'colunas_alvo': list(colunas_alvo),
+        'colunas': [{
+            'nome': nome,
+            'variavel': origem,
+            'tipo': descricoes.at[origem, 'tipo'] if origem in descricoes.index else None,
+            'subtipo': descricoes.at[origem, 'subtipo'] if origem in descricoes.index else None,
+            'descricao': descricoes.at[origem, 'descricao'] if origem in descricoes.index else None,
+        } for nome, origem, _ in fontes],
+    }
+
+    if pasta is None:
+        return MatrizCaracteristicas(valores, colunas, codigos, classes, metadados)
+    valores.flush()
+    del valores
+    # Sem coluna de classe, apagamos o codigos.npy de uma matriz anterior gravada na mesma pasta.
+    caminho_codigos = os.path.join(pasta, 'codigos.npy')
+    if codigos is not None:
+        np.save(caminho_codigos, codigos)
+    elif os.path.exists(caminho_codigos):
+        os.remove(caminho_codigos)
+    with open(os.path.join(pasta, 'metadados.json'), 'w', encoding='utf-8') as arquivo:
+        json.dump(metadados, arquivo, ensure_ascii=False, indent=2)
+    print(f"Matriz de características ({len(df)} x {len(colunas)}, {np.dtype(dtype).name}) salva em: {pasta}")
+    return carregar_matriz_caracteristicas(pasta)
+
+# Abre uma matriz gravada por 'montar_matriz_caracteristicas'. Com modo='r' (padrão) os arquivos são mapeados na
+# memória e só as páginas lidas são carregadas; com modo=None, são lidos inteiros.
+@instrumentar
+def carregar_matriz_caracteristicas(pasta: str, modo: str = 'r') -> MatrizCaracteristicas:
+    with open(os.path.join(pasta, 'metadados.json'), encoding='utf-8') as arquivo:
+        metadados = json.load(arquivo)
+    valores = np.load(os.path.join(pasta, 'valores.npy'), mmap_mode=modo)
+    codigos = None
+    if metadados.get('coluna_classe') is not None:
+        codigos = np.load(os.path.join(pasta, 'codigos.npy'), mmap_mode=modo)
+    return MatrizCaracteristicas(valores, [c['nome'] for c in metadados['colunas']], codigos, metadados['classes'], metadados)
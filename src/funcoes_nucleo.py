@@ -0,0 +1,173 @@
+# Neste arquivo temos o núcleo numérico da análise univariada: separação das variáveis e estatísticas descritivas
+# e condicionais. Ele importa apenas pandas e NumPy, para que processos que só calculam estatísticas (workers,
+# execuções em lote) não paguem a importação do matplotlib, do seaborn, do scipy e do IPython.
+# As funções continuam disponíveis também pelo funcoes_analise_uni.
+import pandas as pd
+import numpy as np
+from funcoes_esbocos import EsbocoEstatisticasDescritivas
+from funcoes_matriz import MatrizCaracteristicas
+from funcoes_instrumentacao import instrumentar
+
+
+# Esta função irá separar nossas variáveis entre quantitativas e qualitativas,
+# ela tem como argumento o dataframe que contém o dicionário de dados e retorna uma tupla (nesse caso, duas listas).
+@instrumentar
+def separar_variaveis(df_dict: pd.DataFrame) -> tuple:
+    
+    # Usamos o dataframe do dicionário (df_dict) feito no pré processamento para criar
+    # uma máscara booleana onde iremos filtrar as linhas onde o 'tipo' seja 'quantitativo' e depois pegue
+    # só a coluna 'variavel' dessas linhas filtradas e converta elas para uma lista python com a função 'tolist()'
+    # jogando tudo isso numa variável 'quantitativa', fazemos o mesmo processo para as variáveis que têm tipo.
+    quantitativas = df_dict[df_dict['tipo'] == 'quantitativa']['variavel'].tolist()
+    qualitativas = df_dict[df_dict['tipo'] == 'qualitativa']['variavel'].tolist()
+
+
+    # Aqui, tiramos as variáveis que não serão usadas na análise univariada, ou seja, a que não contribui como preditor (student_id), 
+    # a nossa variável alvo (exam_score) e a que será usada na análise condicional(perfomance_class). 
+    if 'student_id' in qualitativas:
+        qualitativas.remove('student_id')
+
+    if 'exam_score' in quantitativas:
+        quantitativas.remove('exam_score')
+     
+    if 'performance_class' in qualitativas:
+        qualitativas.remove('performance_class')
+        
+    # Por fim, retornamos a tupla contendo duas listas de variáveis, a quantitativa e a qualitativa.   
+    return quantitativas, qualitativas
+
+# Esta função irá fazer alguns cálculos utlizando as funções da biblioteca do pandas nas colunas do dataframe que indicarmos como parâmetro.
+# 'df' também pode ser uma MatrizCaracteristicas (veja funcoes_matriz); aí cada coluna é lida direto da matriz.
+@instrumentar
+def estatisticas_descritivas_quantitativas(df: pd.DataFrame, colunas: list) -> pd.DataFrame:
+     if isinstance(df, MatrizCaracteristicas):
+         return _descritivas_da_matriz(df, colunas)
+     
+     # Vamos usar a função agg da pandas para realizar 1-contagem dos valores, 2-encontrar o mínimo, 3-encontrar o máximo,4-calcular a média, 5-calcular a mediana,
+     # 6-calcular o desvio padrão, 7-calcular a skewness (assimetria). Depois, usa o .T pra transpostar a coluna pra uma linha para deixar mais agradável aos olhos.
+     estatisticas = df[colunas].agg(['count', 'min', 'max', 'mean', 'median', 'std', 'skew']).T
+
+    # Mudando os nomes para português:
+     estatisticas.columns = ['Contagem', 'Mínimo', 'Máximo', 'Média', 'Mediana', 'Desvio Padrão', 'Assimetria']
+
+    #Por fim, retornamos essas estatísticas:
+     return estatisticas 
+
+# Mesma tabela para as colunas de uma MatrizCaracteristicas, uma coluna por vez (só a coluna atual é convertida para float64).
+# Com um único grupo, as somas dos desvios saem de produtos escalares, e o desvio e a assimetria de '_fechar_momentos',
+# com as mesmas fórmulas do pandas.
+def _descritivas_da_matriz(matriz: MatrizCaracteristicas, colunas: list) -> pd.DataFrame:
+    linhas = []
+    for coluna in colunas:
+        valores = np.asarray(matriz.coluna(coluna), dtype=np.float64)
+        presentes = valores[~np.isnan(valores)]
+        if len(presentes) == 0:
+            linhas.append([0.0] + [np.nan] * 6)
+            continue
+        media = presentes.mean()
+        desvio = presentes - media
+        quadrados = desvio * desvio
+        _, _, desvio_padrao, assimetria = _fechar_momentos(np.array([float(len(presentes))]), np.array([media]),
+                                                           np.array([quadrados.sum()]), np.array([quadrados @ desvio]))
+        linhas.append([float(len(presentes)), presentes.min(), presentes.max(), media, np.median(presentes), desvio_padrao[0], assimetria[0]])
+    return pd.DataFrame(linhas, index=list(colunas), columns=['Contagem', 'Mínimo', 'Máximo', 'Média', 'Mediana', 'Desvio Padrão', 'Assimetria'])
+
+# Mesma tabela da função anterior, mas lendo o CSV em blocos: cada bloco atualiza um esboço de momentos (contagem, mínimo,
+# máximo, média, M2, M3) e um esboço de quantis para a mediana, então o arquivo nunca precisa estar inteiro na memória.
+# A mediana é exata enquanto cada coluna tiver até 'max_centroides' valores distintos e aproximada a partir daí.
+# Para calcular em paralelo, cada processo pode montar o seu EsbocoEstatisticasDescritivas e depois juntar com 'mesclar'.
+@instrumentar
+def estatisticas_descritivas_quantitativas_em_blocos(caminho_ou_url: str, colunas: list, tamanho_bloco: int = 100_000, max_centroides: int = 2048) -> pd.DataFrame:
+    esboco = EsbocoEstatisticasDescritivas(colunas, max_centroides)
+    for bloco in pd.read_csv(caminho_ou_url, usecols=colunas, chunksize=tamanho_bloco):
+        esboco.atualizar(bloco)
+    return esboco.tabela()
+
+# Esta função irá fazer algo parecido com a da anterior só que dessa vez será com as variáveis qualitativas.
+# Usaremos como parâmetros a tabela completa (df) e uma lista com os nomes das colunas qualitativas que queremos ver(colunas), retornando um dicionário(dict) jpa que cada coluna tem categorias diferentes, então não retornaremos um dataframe como na função anterior.
+@instrumentar
+def estatisticas_descritivas_qualitativas(df: pd.DataFrame, colunas: list) -> dict:
+     
+     resultados = {} # Dicionário vazio
+     
+     # col vai passar pelas colunas do dataframe e a função value_conts vai contar cada valor único.
+     # o normalize true vai nos dar frações entre 0 e 1 e depois passar pra porcentagem com o *100 pra termos nossas medidas diferentes padronizadas e normalizadas em forma de fração. É uma forma de discretizar as nossas variáveis categóricas (qualitativas.
+     for col in colunas:
+        contagem = df[col].value_counts()
+        proporcao = df[col].value_counts(normalize=True) * 100
+        df_temp = pd.DataFrame({
+            'Contagem': contagem,
+            'Proporção (%)': proporcao
+        })
+        resultados[col] = df_temp
+     
+     #Ao final teremos um dicionário de dataframes onde cada dataframe tem uma contagem e uma proporção, e cada dataframe está associado a uma coluna que veio do parâmetro da função.
+     return resultados
+
+#  Aqui vamos calcular estatísticas descritivas (média, desvio padrão e assimetria) para cada variável quantitativa para cada classe de desempenho.
+# Em vez de filtrar o dataframe uma vez por variável e por classe, transformamos a coluna de classe em códigos inteiros
+# (posição da classe na lista 'classes', -1 para as demais) e calculamos os momentos de todos os grupos de uma vez com o 'bincount'.
+# Com uma MatrizCaracteristicas no lugar de 'df', os códigos da classe gravados nela são usados ('coluna_classe' é ignorada).
+# Classes repetidas em 'classes' continuam valendo, como no laço original: cada ocorrência gera as suas linhas na tabela.
+@instrumentar
+def estatisticas_condicionais_por_classe_especifica(df: pd.DataFrame, colunas_quantitativas: list, classes: list, coluna_classe: str = 'performance_class') -> pd.DataFrame:
+    classes = list(classes)
+    unicas, posicoes = _classes_unicas(classes)
+    if isinstance(df, MatrizCaracteristicas):
+        codigos = df.codigos_para(unicas)
+        momentos = [_momentos_por_grupo(np.asarray(df.coluna(c), dtype=np.float64), codigos, len(unicas)) for c in colunas_quantitativas]
+    else:
+        codigos = pd.Categorical(df[coluna_classe], categories=unicas).codes
+        valores = df[colunas_quantitativas].to_numpy(dtype=np.float64, na_value=np.nan)
+        # Para cada variável quantitativa, uma única passada cobre todas as classes.
+        momentos = [_momentos_por_grupo(valores[:, j], codigos, len(unicas)) for j in range(len(colunas_quantitativas))]
+    return _tabela_condicional(colunas_quantitativas, classes, [tuple(m[posicoes] for m in momento) for momento in momentos])
+
+# O pd.Categorical não aceita categorias repetidas (por exemplo, 'classes' montada com list(df[coluna])): os códigos
+# usam as classes únicas, na ordem da primeira ocorrência, e 'posicoes' leva cada classe pedida à sua posição entre elas.
+def _classes_unicas(classes: list) -> tuple:
+    unicas = list(dict.fromkeys(classes))
+    indice = {classe: k for k, classe in enumerate(unicas)}
+    return unicas, np.array([indice[classe] for classe in classes], dtype=np.int64)
+
+# Monta a tabela das estatísticas condicionais a partir dos momentos (n, média, desvio, assimetria) de cada variável,
+# na ordem de 'colunas_quantitativas' (também usada pelo funcoes_paralelo para juntar os fragmentos).
+def _tabela_condicional(colunas_quantitativas: list, classes: list, momentos: list) -> pd.DataFrame:
+    n_obs, medias, desvios, assimetrias = (list(m) for m in zip(*momentos)) if momentos else ([], [], [], [])
+    return pd.DataFrame({
+        'Variável': np.repeat(colunas_quantitativas, len(classes)),
+        'Classe': list(classes) * len(colunas_quantitativas),
+        'N_observações': np.concatenate(n_obs).astype(int) if n_obs else [],
+        'Média': np.concatenate(medias) if medias else [],
+        'Desvio_Padrão': np.concatenate(desvios) if desvios else [],
+        'Assimetria': np.concatenate(assimetrias) if assimetrias else []
+    })
+
+# Calcula contagem, média, desvio padrão amostral e assimetria (mesmas fórmulas do pandas) de 'valores' para cada grupo
+# indicado em 'codigos' (inteiros de 0 a n_grupos-1; negativos e NaN são ignorados).
+def _momentos_por_grupo(valores: np.ndarray, codigos: np.ndarray, n_grupos: int) -> tuple:
+    validos = (codigos >= 0) & ~np.isnan(valores)
+    x = valores[validos]
+    g = codigos[validos]
+
+    n = np.bincount(g, minlength=n_grupos).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media = np.bincount(g, weights=x, minlength=n_grupos) / n
+        # Somas dos desvios ao quadrado e ao cubo, centradas na média de cada grupo para manter a precisão.
+        desvio = x - media[g]
+        m2 = np.bincount(g, weights=desvio ** 2, minlength=n_grupos)
+        m3 = np.bincount(g, weights=desvio ** 3, minlength=n_grupos)
+    return _fechar_momentos(n, media, m2, m3)
+
+# Desvio padrão amostral e assimetria a partir da contagem, da média e das somas dos desvios ao quadrado e ao cubo
+# de cada grupo (arrays de mesmo tamanho).
+def _fechar_momentos(n: np.ndarray, media: np.ndarray, m2: np.ndarray, m3: np.ndarray) -> tuple:
+    m2[np.abs(m2) < 1e-14] = 0
+    m3[np.abs(m3) < 1e-14] = 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        desvio_padrao = np.sqrt(m2 / (n - 1))
+        assimetria = (n * (n - 1) ** 0.5 / (n - 2)) * (m3 / m2 ** 1.5)
+    desvio_padrao[n < 2] = np.nan
+    assimetria = np.where(m2 == 0, 0, assimetria)
+    assimetria[n < 3] = np.nan
+    return n, media, desvio_padrao, assimetria
@@ -0,0 +1,217 @@
+# Neste arquivo temos a execução em vários processos das análises que tratam cada coluna (ou cada classe) de forma
+# independente. Os dados vão para os processos como blocos NumPy em memória compartilhada (multiprocessing.shared_memory),
+# anexados uma única vez por processo, em vez de dataframes serializados com pickle. Cada processo devolve só o
+# resultado do seu fragmento e os fragmentos são juntados pela posição original das colunas e classes, então o
+# resultado é idêntico ao da versão sequencial com qualquer número de processos.
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from funcoes_nucleo import separar_variaveis, _momentos_por_grupo, _tabela_condicional, _classes_unicas
+from funcoes_instrumentacao import instrumentar
+
+
+# Blocos já abertos neste processo, pelo nome do segmento. No processo principal ficam aqui os blocos criados por ele,
+# para que a execução sem pool (n_processos=1) use o mesmo caminho dos processos de trabalho.
+_blocos_abertos = {}
+
+
+# Array NumPy em um segmento de memória compartilhada. 'BlocoCompartilhado(array)' cria o segmento e copia o array;
+# nos outros processos, '_anexar(bloco.descritor)' abre o mesmo segmento sem copiar nada.
+class BlocoCompartilhado:
+
+    def __init__(self, array: np.ndarray = None, descritor: tuple = None):
+        if descritor is None:
+            array = np.ascontiguousarray(array)
+            self._memoria = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self.array = np.ndarray(array.shape, dtype=array.dtype, buffer=self._memoria.buf)
+            self.array[...] = array
+            self._criador = True
+        else:
+            nome, forma, tipo = descritor
+            self._memoria = shared_memory.SharedMemory(name=nome)
+            self.array = np.ndarray(forma, dtype=tipo, buffer=self._memoria.buf)
+            self._criador = False
+        _blocos_abertos[self._memoria.name] = self
+
+    # O que vai para os processos: só o nome do segmento, a forma e o tipo (algumas dezenas de bytes).
+    @property
+    def descritor(self) -> tuple:
+        return (self._memoria.name, self.array.shape, self.array.dtype.str)
+
+    # Fecha o segmento neste processo e, no processo que o criou, libera a memória.
+    def fechar(self) -> None:
+        _blocos_abertos.pop(self._memoria.name, None)
+        self.array = None
+        self._memoria.close()
+        if self._criador:
+            self._memoria.unlink()
+
+def _anexar(descritor: tuple) -> np.ndarray:
+    bloco = _blocos_abertos.get(descritor[0])
+    if bloco is None:
+        bloco = BlocoCompartilhado(descritor=descritor)
+    return bloco.array
+
+
+# Dataframe inteiro em memória compartilhada: colunas numéricas vão como estão; colunas 'category' e de texto vão como
+# códigos inteiros, e só as categorias (poucas) são serializadas. 'reconstruir_dataframe' remonta o dataframe em outro
+# processo com as mesmas colunas e tipos (o índice volta como 0..n-1).
+class DataFrameCompartilhado:
+
+    def __init__(self, df: pd.DataFrame):
+        self.blocos = []
+        colunas = []
+        for coluna in df.columns:
+            serie = df[coluna]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                bloco = BlocoCompartilhado(serie.cat.codes.to_numpy())
+                colunas.append((coluna, 'categoria', bloco.descritor, serie.dtype))
+            elif isinstance(serie.dtype, np.dtype) and serie.dtype.kind in 'biufcmM':
+                bloco = BlocoCompartilhado(serie.to_numpy())
+                colunas.append((coluna, 'numerica', bloco.descritor, None))
+            else:
+                codigos, categorias = pd.factorize(serie)
+                bloco = BlocoCompartilhado(codigos)
+                colunas.append((coluna, 'objeto', bloco.descritor, (np.asarray(categorias, dtype=object), serie.dtype)))
+            self.blocos.append(bloco)
+        self.descritor = {'n_linhas': len(df), 'colunas': colunas}
+
+    def fechar(self) -> None:
+        for bloco in self.blocos:
+            bloco.fechar()
+        self.blocos = []
+
+    def __enter__(self) -> 'DataFrameCompartilhado':
+        return self
+
+    def __exit__(self, *excecao) -> None:
+        self.fechar()
+
+def reconstruir_dataframe(descritor: dict) -> pd.DataFrame:
+    colunas = {}
+    for coluna, tipo, descritor_bloco, extra in descritor['colunas']:
+        valores = _anexar(descritor_bloco)
+        if tipo == 'categoria':
+            colunas[coluna] = pd.Categorical.from_codes(valores, dtype=extra)
+        elif tipo == 'objeto':
+            categorias, dtype = extra
+            objetos = categorias.take(np.where(valores >= 0, valores, 0)) if len(categorias) else np.empty(len(valores), dtype=object)
+            objetos[valores < 0] = np.nan
+            colunas[coluna] = pd.Series(objetos, dtype=dtype)
+        else:
+            colunas[coluna] = valores
+    return pd.DataFrame(colunas, index=pd.RangeIndex(descritor['n_linhas']))
+
+
+# Divide 'n' itens em até 'n_fragmentos' fragmentos contíguos (na ordem original).
+def _fragmentos(n: int, n_fragmentos: int) -> list:
+    return [f for f in np.array_split(np.arange(n), max(1, min(n, n_fragmentos))) if len(f)]
+
+# Executa 'funcao(*argumentos)' para cada item de 'tarefas' em 'n_processos' processos (1 = no próprio processo)
+# e devolve os resultados na ordem das tarefas.
+def _mapear(funcao, tarefas: list, n_processos: int) -> list:
+    if n_processos == 1 or len(tarefas) <= 1:
+        return [funcao(*argumentos) for argumentos in tarefas]
+    with ProcessPoolExecutor(max_workers=min(n_processos, len(tarefas))) as executor:
+        return list(executor.map(funcao, *zip(*tarefas)))
+
+
+# Momentos por classe das colunas 'indices_colunas' da matriz compartilhada (uma variável por linha). Com
+# 'indices_classes', só as linhas dessas classes entram (as demais viram -1); as outras classes ficam vazias.
+def _momentos_fragmento(descritor_valores: tuple, descritor_codigos: tuple, indices_colunas: np.ndarray,
+                        indices_classes: np.ndarray, n_classes: int) -> list:
+    valores = _anexar(descritor_valores)
+    codigos = _anexar(descritor_codigos)
+    if indices_classes is not None:
+        codigos = np.where(np.isin(codigos, indices_classes), codigos, -1)
+    return [(j, _momentos_por_grupo(valores[j], codigos, n_classes)) for j in indices_colunas]
+
+# Mesma tabela de 'estatisticas_condicionais_por_classe_especifica', com o trabalho dividido entre processos por
+# variável ('fragmentar="colunas"') ou por classe ('fragmentar="classes"', melhor quando há poucas variáveis e muitas classes).
+@instrumentar
+def estatisticas_condicionais_paralelas(df: pd.DataFrame, colunas_quantitativas: list, classes: list, coluna_classe: str = 'performance_class',
+                                         fragmentar: str = 'colunas', n_processos: int = None) -> pd.DataFrame:
+    n_processos = n_processos or os.cpu_count()
+    classes = list(classes)
+    unicas, posicoes = _classes_unicas(classes)
+    n_colunas, n_classes = len(colunas_quantitativas), len(unicas)
+    if fragmentar == 'colunas':
+        tarefas = [(f, None) for f in _fragmentos(n_colunas, n_processos)]
+    elif fragmentar == 'classes':
+        tarefas = [(np.arange(n_colunas), f) for f in _fragmentos(n_classes, n_processos)]
+    else:
+        raise ValueError(f"Fragmentação desconhecida: '{fragmentar}'. Use 'colunas' ou 'classes'.")
+
+    # Uma variável por linha, para que cada processo leia só as suas variáveis em memória contígua.
+    valores = BlocoCompartilhado(df[colunas_quantitativas].to_numpy(dtype=np.float64, na_value=np.nan).T)
+    codigos = BlocoCompartilhado(pd.Categorical(df[coluna_classe], categories=unicas).codes)
+    try:
+        parciais = _mapear(_momentos_fragmento, [(valores.descritor, codigos.descritor, c, k, n_classes) for c, k in tarefas], n_processos)
+    finally:
+        valores.fechar()
+        codigos.fechar()
+
+    # Junta os fragmentos pela posição: cada par (variável, classe) vem de exatamente um fragmento.
+    momentos = np.full((n_colunas, 4, n_classes), np.nan)
+    for (_, indices_classes), parcial in zip(tarefas, parciais):
+        k = slice(None) if indices_classes is None else indices_classes
+        for j, resultado in parcial:
+            momentos[j][:, k] = np.asarray(resultado)[:, k]
+    return _tabela_condicional(colunas_quantitativas, classes, [tuple(m[:, posicoes]) for m in momentos])
+
+
+def _contagens_fragmento(descritor_codigos: tuple, indices_colunas: np.ndarray, n_categorias: list) -> list:
+    codigos = _anexar(descritor_codigos)
+    return [(j, np.bincount(codigos[j][codigos[j] >= 0], minlength=n_categorias[j])) for j in indices_colunas]
+
+# Mesmo dicionário de 'estatisticas_descritivas_qualitativas'. As colunas são codificadas no processo principal
+# (o texto não vai para a memória compartilhada) e as contagens são feitas nos processos, uma coluna por tarefa.
+# A ordem das categorias segue a do 'value_counts': contagem decrescente e, nos empates, a ordem das categorias
+# (colunas 'category') ou da primeira aparição (as demais).
+@instrumentar
+def estatisticas_descritivas_qualitativas_paralelas(df: pd.DataFrame, colunas: list, n_processos: int = None) -> dict:
+    n_processos = n_processos or os.cpu_count()
+    codigos, categorias = [], []
+    for coluna in colunas:
+        if isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            codigos.append(df[coluna].cat.codes.to_numpy(dtype=np.int64))
+            categorias.append(pd.CategoricalIndex(df[coluna].cat.categories, dtype=df[coluna].dtype))
+        else:
+            codigo, categoria = pd.factorize(df[coluna])
+            codigos.append(codigo.astype(np.int64))
+            categorias.append(categoria)
+
+    bloco = BlocoCompartilhado(np.vstack(codigos) if codigos else np.empty((0, len(df)), dtype=np.int64))
+    n_categorias = [len(c) for c in categorias]
+    try:
+        parciais = _mapear(_contagens_fragmento, [(bloco.descritor, f, n_categorias) for f in _fragmentos(len(colunas), n_processos)], n_processos)
+    finally:
+        bloco.fechar()
+
+    resultados = {}
+    for j, contagem in sorted(par for parcial in parciais for par in parcial):
+        ordem = np.argsort(-contagem, kind='stable')
+        indice = categorias[j].take(ordem).rename(colunas[j])
+        resultados[colunas[j]] = pd.DataFrame({
+            'Contagem': pd.Series(contagem[ordem], index=indice, name='count'),
+            'Proporção (%)': pd.Series(contagem[ordem] / contagem.sum(), index=indice, name='proportion') * 100
+        })
+    return resultados
+
+
+# Relatório univariado completo em 'n_processos' processos: as tabelas condicionais e qualitativas divididas por
+# coluna e as figuras (uma por tarefa, veja funcoes_renderizacao) salvas em 'pasta_saida'. Devolve as tabelas e os tempos das figuras.
+@instrumentar
+def relatorio_univariado_paralelo(df: pd.DataFrame, df_dict: pd.DataFrame, pasta_saida: str, coluna_alvo: str = 'performance_class',
+                                  classes: list = None, n_processos: int = None) -> dict:
+    import funcoes_renderizacao as fr
+
+    quantitativas, qualitativas = separar_variaveis(df_dict)
+    classes = classes if classes is not None else list(df[coluna_alvo].dropna().unique())
+    return {
+        'condicionais': estatisticas_condicionais_paralelas(df, quantitativas, classes, coluna_alvo, n_processos=n_processos),
+        'qualitativas': estatisticas_descritivas_qualitativas_paralelas(df, qualitativas, n_processos),
+        'figuras': fr.renderizar_figuras(df, fr.tarefas_univariadas(df, df_dict, coluna_alvo), pasta_saida, n_processos),
+    }
@@ -1,29 +1,14 @@
+import os
+import sys
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import mpl_axes_aligner
-
-
-def biplot(df_pca: pd.DataFrame, df_loads: pd.DataFrame) -> None:
-    #são criados subplots
-    fig,ax = plt.subplots(figsize=(15,8))
-    #gráfico de dispersão PC1xPC2
-    ax.scatter(df_pca.PC1.values,df_pca.PC2.values, color='b')
-    ax.set_xlabel("PC1", fontsize = 10)
-    ax.set_ylabel("PC2", fontsize = 10)
-    ax.set_xlim(-1, 1)
-    ax.set_ylim(-1, 1)
-    ax.axhline(0, color='gray', linewidth=0.8)
-    ax.axvline(0, color='gray', linewidth=0.8)
+from funcoes_instrumentacao import instrumentar, salvar_figura
+from funcoes_matriz import MatrizCaracteristicas
+from funcoes_pre_processamento import MatrizPreditoresMista
 
-    #aqui é criado um segundo eixo
-    ax2 = ax.twinx().twiny()
-    #ajuste de fonte
-    font = {'color': 'g',
-            'weight': 'bold',
-            'size': 5,
-            }
-    #dicionário para melhorar a visualização dos nomes das features no gráfico
-    colunas = {
+
+# Dicionário para melhorar a visualização dos nomes das features nos gráficos do PCA.
+ROTULOS_VARIAVEIS = {
     "study_hours_per_day": "Horas de Estudo", "social_media_hours": "Redes Sociais", "netflix_hours": "Netflix",
     "attendance_percentage": "Presença(%)", "sleep_hours": "Horas de Sono", "exercise_frequency": "Frequência de Exerc.",
     "mental_health_rating": "Saúde Mental", "gender_Male": "Gênero (Masc)", "gender_Other": "Gênero (Outro)",
@@ -31,18 +16,469 @@ def biplot(df_pca: pd.DataFrame, df_loads: pd.DataFrame) -> None:
     "parental_education_level_High School": "Pais (Ens. Médio)", "parental_education_level_Master": "Pais (Mestrado)",
     "internet_quality_Good": "Internet (Boa)", "internet_quality_Poor": "Internet (Ruim)",
     "extracurricular_participation_Yes": "Extracurricular", "age": "Idade"
-    
-    }
-    #definção das setas e do texto de acordo com os loadings do PCA
-    for col in df_loads.columns.values:
-        tipx = df_loads.loc['PC1',col]
-        tipy = df_loads.loc['PC2',col]
-
-        ax2.arrow(0, 0, tipx, tipy, color = 'r', alpha = 0.5)
-        ax2.text(tipx*1.05, tipy*1.05, colunas[col], fontdict = font, ha = 'center', va = 'center')
-    #alinhamento do texto e setas
-    mpl_axes_aligner.align.xaxes(ax, 0, ax2, 0, 0.5)
-    mpl_axes_aligner.align.yaxes(ax, 0, ax2, 0, 0.5)
-
-    plt.title("Biplot")
-    plt.savefig("resultados/figuras_pca/biplot.png")
\ No newline at end of file
+}
+
+# Cores das classes de desempenho na projeção (as mesmas do notebook do PCA).
+CORES_CLASSES = {'Reprovado': 'red', 'Recuperação': 'gold', 'Bom': 'blue', 'Excelente': 'green'}
+
+
+# Número de linhas centralizadas de cada vez ao acumular variâncias e covariâncias.
+_TAMANHO_BLOCO = 100_000
+
+
+# PCA reutilizável, no lugar do cálculo feito à mão no notebook (np.cov + np.linalg.eig).
+# A matriz de covariância é simétrica, então usamos o 'eigh' (mais rápido e sempre com autovalores reais) ou a SVD
+# reduzida da matriz padronizada, que dá os mesmos componentes sem montar a covariância. Para matrizes grandes em que
+# só interessam os 'n_componentes' primeiros componentes, o solver 'randomizado' faz uma SVD truncada aleatória.
+# Os componentes ficam em ordem decrescente de variância e com sinal fixo (maior carga em módulo positiva).
+class PCA:
+
+    def __init__(self, n_componentes: int = None, solver: str = 'auto', padronizar: bool = True,
+                 n_iteracoes: int = 7, sobreamostragem: int = 10, semente: int = None):
+        self.n_componentes = n_componentes
+        self.solver = solver
+        self.padronizar = padronizar
+        self.n_iteracoes = n_iteracoes
+        self.sobreamostragem = sobreamostragem
+        self.semente = semente
+
+    # 'X' pode ser um DataFrame, um array, uma matriz esparsa do scipy ou uma MatrizPreditoresMista (a saída de
+    # funcoes_pre_processamento.montar_matriz_preditores com esparso=True); nesses casos os nomes das colunas vão em 'nomes'.
+    # A centralização e o escalonamento não geram uma cópia centralizada de X: a covariância é acumulada por blocos
+    # de linhas convertidos para float64 um de cada vez (ou pela matriz de Gram, no caso esparso) e o solver randomizado
+    # usa produtos com X corrigidos pela média. Um DataFrame com dummies uint8 nunca é convertido inteiro para float64.
+    # 'X' também pode ser uma MatrizCaracteristicas (veja funcoes_matriz): entram só as 'colunas_preditoras' (a variável
+    # alvo fica de fora) e, mesmo em float32 ou em um memmap, elas são usadas como estão; cada bloco de linhas é
+    # convertido para float64 só quando é centralizado.
+    @instrumentar
+    def fit(self, X, nomes: list = None) -> 'PCA':
+        self.nomes_ = list(X.columns) if isinstance(X, pd.DataFrame) else X.colunas_preditoras if isinstance(X, MatrizCaracteristicas) else nomes
+        esparsa = _eh_esparsa(X) or isinstance(X, MatrizPreditoresMista)
+        if isinstance(X, MatrizPreditoresMista):
+            X = MatrizPreditoresMista(X.numericas, X.dummies.tocsr().astype(np.float64))
+        else:
+            X = X.tocsr().astype(np.float64) if esparsa else _matriz_densa(X)
+        n, p = X.shape
+        k = p if self.n_componentes is None else min(self.n_componentes, p)
+
+        # Escalonamento com o desvio padrão amostral (ddof=1), como no notebook.
+        self.media_ = _media(X)
+        variancias = _variancias(X, self.media_)
+        self.desvio_ = np.sqrt(variancias) if self.padronizar else np.ones(p)
+        self.desvio_[self.desvio_ == 0] = 1.0
+        self.variancia_total_ = float((variancias / self.desvio_ ** 2).sum())
+
+        solver = self.solver
+        if solver == 'auto':
+            if k < 0.8 * min(n, p) and min(n, p) > 500:
+                solver = 'randomizado'
+            else:
+                solver = 'eigh' if n >= p or esparsa else 'svd'
+
+        if solver == 'eigh':
+            covariancia = _covariancia(X, self.media_) / np.outer(self.desvio_, self.desvio_)
+            autovalores, autovetores = np.linalg.eigh(covariancia)
+            ordem = np.argsort(autovalores)[::-1][:k]
+            autovalores, componentes = autovalores[ordem], autovetores[:, ordem].T
+        elif solver == 'svd':
+            # A SVD completa precisa da matriz padronizada explícita.
+            Z = ((X.toarray() if esparsa else _linhas(X, 0, n)) - self.media_) / self.desvio_
+            _, S, Vt = np.linalg.svd(Z, full_matrices=False)
+            autovalores, componentes = S[:k] ** 2 / (n - 1), Vt[:k]
+        elif solver == 'randomizado':
+            escala = 1 / self.desvio_
+            deslocamento = self.media_ * escala
+            # Z·M = X·(M/σ) − 1·(μ/σ)ᵀM  e  Zᵀ·Q = (XᵀQ − μ·1ᵀQ)/σ, sem montar Z.
+            produto = lambda M: _produto(X, M * escala[:, None]) - deslocamento @ M
+            produto_transposto = lambda Q: (_produto_transposto(X, Q) - np.outer(self.media_, Q.sum(axis=0))) * escala[:, None]
+            S, Vt = _svd_randomizado(produto, produto_transposto, (n, p), k, self.n_iteracoes, self.sobreamostragem, self.semente)
+            autovalores, componentes = S ** 2 / (n - 1), Vt
+        else:
+            raise ValueError(f"Solver desconhecido: '{self.solver}'. Use 'auto', 'eigh', 'svd' ou 'randomizado'.")
+
+        self.componentes_ = _fixar_sinais(componentes)
+        self.autovalores_ = np.clip(autovalores, 0, None)
+        self.razao_variancia_explicada_ = self.autovalores_ / self.variancia_total_
+        self.solver_ = solver
+        return self
+
+    # Projeção nos componentes: ((X - média) / desvio) · componentesᵀ, calculada como X·W − b para não centralizar X.
+    @instrumentar
+    def transform(self, X):
+        indice = X.index if isinstance(X, pd.DataFrame) else None
+        if not (_eh_esparsa(X) or isinstance(X, MatrizPreditoresMista)):
+            X = _matriz_densa(X)
+        pesos = self.componentes_.T / self.desvio_[:, None]
+        projecao = np.asarray(_produto(X, pesos)) - (self.media_ / self.desvio_) @ self.componentes_.T
+        if indice is not None:
+            return pd.DataFrame(projecao, index=indice, columns=self._nomes_componentes())
+        return projecao
+
+    def fit_transform(self, X, nomes: list = None):
+        return self.fit(X, nomes).transform(X)
+
+    # Volta do espaço dos componentes para as variáveis originais (exata quando todos os componentes são mantidos).
+    def inverse_transform(self, projecao):
+        indice = projecao.index if isinstance(projecao, pd.DataFrame) else None
+        X = np.asarray(projecao, dtype=np.float64) @ self.componentes_ * self.desvio_ + self.media_
+        if indice is not None:
+            return pd.DataFrame(X, index=indice, columns=self.nomes_)
+        return X
+
+    # Loadings no formato usado pelo biplot: uma linha por componente (PC1, PC2, ...) e uma coluna por variável.
+    def cargas(self) -> pd.DataFrame:
+        return pd.DataFrame(self.componentes_, index=self._nomes_componentes(), columns=self.nomes_)
+
+    def _nomes_componentes(self) -> list:
+        return [f'PC{i+1}' for i in range(len(self.componentes_))]
+
+
+# Atalho para criar e ajustar um PCA em uma chamada (é a forma usada pelo cache de resultados em funcoes_cache).
+@instrumentar
+def ajustar_pca(X, n_componentes: int = None, solver: str = 'auto', padronizar: bool = True, nomes: list = None, semente: int = None) -> PCA:
+    return PCA(n_componentes=n_componentes, solver=solver, padronizar=padronizar, semente=semente).fit(X, nomes)
+
+
+# PCA incremental: em vez de precisar da matriz inteira, recebe os dados em blocos com 'partial_fit' e acumula a
+# contagem, a média e a matriz de co-momentos (soma dos produtos dos desvios) com a fórmula de Chan. Os componentes
+# saem do 'eigh' da matriz de correlação (ou covariância, sem padronização) acumulada e coincidem com os do PCA em lote
+# até o erro de arredondamento. transform, inverse_transform e cargas são os mesmos da classe PCA.
+# O 'eigh' (O(p³)) não roda a cada bloco: os componentes são calculados no primeiro acesso depois de um 'partial_fit'
+# (ou com 'finalizar()'), a partir dos co-momentos acumulados.
+class PCAIncremental(PCA):
+
+    _ATRIBUTOS_COMPONENTES = ('componentes_', 'autovalores_', 'desvio_', 'variancia_total_', 'razao_variancia_explicada_', 'solver_')
+
+    def __init__(self, n_componentes: int = None, padronizar: bool = True, tamanho_bloco: int = 100_000):
+        super().__init__(n_componentes=n_componentes, solver='eigh', padronizar=padronizar)
+        self.tamanho_bloco = tamanho_bloco
+        self.n_amostras_ = 0
+
+    @instrumentar
+    def partial_fit(self, X) -> 'PCAIncremental':
+        if self.n_amostras_ == 0:
+            self.nomes_ = list(X.columns) if isinstance(X, pd.DataFrame) else None
+        X = X.toarray() if _eh_esparsa(X) or isinstance(X, MatrizPreditoresMista) else np.asarray(X, dtype=np.float64)
+        if len(X) == 0:
+            return self
+        media_bloco = X.mean(axis=0)
+        centrado = X - media_bloco
+        comomentos_bloco = centrado.T @ centrado
+
+        if self.n_amostras_ == 0:
+            self.media_, self.comomentos_, self.n_amostras_ = media_bloco, comomentos_bloco, len(X)
+        else:
+            n = self.n_amostras_ + len(X)
+            delta = media_bloco - self.media_
+            self.comomentos_ = self.comomentos_ + comomentos_bloco + np.outer(delta, delta) * (self.n_amostras_ * len(X) / n)
+            self.media_ = self.media_ + delta * (len(X) / n)
+            self.n_amostras_ = n
+
+        # Os componentes antigos deixam de valer; serão recalculados quando forem lidos.
+        for atributo in self._ATRIBUTOS_COMPONENTES:
+            self.__dict__.pop(atributo, None)
+        return self
+
+    # Só é chamado quando o atributo não existe, ou seja, quando os componentes ainda não foram calculados.
+    def __getattr__(self, nome: str):
+        if nome in PCAIncremental._ATRIBUTOS_COMPONENTES and self.__dict__.get('n_amostras_', 0) > 0:
+            self.finalizar()
+            return self.__dict__[nome]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{nome}'")
+
+    # 'fit' recomeça do zero e passa os dados em blocos de 'tamanho_bloco' linhas (de uma MatrizCaracteristicas,
+    # cada bloco é uma visão da matriz). Mesma assinatura de PCA.fit, para que 'fit_transform' funcione igual.
+    @instrumentar
+    def fit(self, X, nomes: list = None) -> 'PCAIncremental':
+        self.n_amostras_ = 0
+        if isinstance(X, MatrizCaracteristicas):
+            nomes = X.colunas_preditoras if nomes is None else nomes
+            X = _matriz_densa(X)
+        for inicio in range(0, len(X), self.tamanho_bloco):
+            self.partial_fit(X[inicio:inicio + self.tamanho_bloco])
+        if nomes is not None:
+            self.nomes_ = list(nomes)
+        return self
+
+    # Calcula os componentes a partir dos co-momentos acumulados até agora.
+    def finalizar(self) -> 'PCAIncremental':
+        p = len(self.media_)
+        k = p if self.n_componentes is None else min(self.n_componentes, p)
+        covariancia = self.comomentos_ / (self.n_amostras_ - 1)
+        if self.padronizar:
+            self.desvio_ = np.sqrt(np.diag(covariancia))
+            self.desvio_[self.desvio_ == 0] = 1.0
+            covariancia = covariancia / np.outer(self.desvio_, self.desvio_)
+        else:
+            self.desvio_ = np.ones(p)
+
+        autovalores, autovetores = np.linalg.eigh(covariancia)
+        ordem = np.argsort(autovalores)[::-1][:k]
+        self.componentes_ = _fixar_sinais(autovetores[:, ordem].T)
+        self.autovalores_ = np.clip(autovalores[ordem], 0, None)
+        self.variancia_total_ = float(np.trace(covariancia))
+        self.razao_variancia_explicada_ = self.autovalores_ / self.variancia_total_
+        self.solver_ = 'eigh'
+        return self
+
+
+# Monta a matriz de preditores de um bloco do CSV: colunas numéricas seguidas das dummies (drop_first) das categóricas.
+# As categorias de cada coluna são fixadas em 'categorias' para que todos os blocos tenham as mesmas colunas,
+# na mesma ordem do pd.get_dummies aplicado ao arquivo inteiro.
+@instrumentar
+def montar_bloco_pca(bloco: pd.DataFrame, colunas_numericas: list, categorias: dict) -> pd.DataFrame:
+    categoricas = pd.DataFrame({coluna: pd.Categorical(bloco[coluna], categories=valores) for coluna, valores in categorias.items()},
+                               index=bloco.index)
+    dummies = pd.get_dummies(categoricas, drop_first=True, dtype=np.uint8)
+    return pd.concat([bloco[colunas_numericas], dummies], axis=1)
+
+# Ajusta um PCAIncremental lendo o CSV em blocos, sem carregar o arquivo inteiro. A primeira passada só levanta as
+# categorias de cada coluna categórica; a segunda monta as dummies de cada bloco e chama 'partial_fit'.
+@instrumentar
+def ajustar_pca_em_blocos(caminho_ou_url: str, colunas_numericas: list, colunas_categoricas: list,
+                          n_componentes: int = None, tamanho_bloco: int = 100_000) -> PCAIncremental:
+    valores = {coluna: set() for coluna in colunas_categoricas}
+    for bloco in pd.read_csv(caminho_ou_url, usecols=colunas_categoricas, chunksize=tamanho_bloco):
+        for coluna in colunas_categoricas:
+            valores[coluna].update(bloco[coluna].dropna().unique())
+    categorias = {coluna: sorted(valores[coluna]) for coluna in colunas_categoricas}
+
+    pca = PCAIncremental(n_componentes=n_componentes)
+    for bloco in pd.read_csv(caminho_ou_url, usecols=colunas_numericas + colunas_categoricas, chunksize=tamanho_bloco):
+        pca.partial_fit(montar_bloco_pca(bloco, colunas_numericas, categorias))
+    return pca
+
+
+# SVD truncada aleatória (Halko, Martinsson e Tropp): projeta Z em k + sobreamostragem direções aleatórias,
+# refina a base com algumas iterações de potência e faz a SVD exata só dessa matriz pequena.
+# Z só é acessada pelos produtos Z·M ('produto') e Zᵀ·Q ('produto_transposto').
+def _svd_randomizado(produto, produto_transposto, forma: tuple, k: int, n_iteracoes: int, sobreamostragem: int, semente: int) -> tuple:
+    gerador = np.random.default_rng(semente)
+    l = min(k + sobreamostragem, min(forma))
+    Q, _ = np.linalg.qr(produto(gerador.standard_normal((forma[1], l))))
+    for _ in range(n_iteracoes):
+        Q, _ = np.linalg.qr(produto_transposto(Q))
+        Q, _ = np.linalg.qr(produto(Q))
+    _, S, Vt = np.linalg.svd(produto_transposto(Q).T, full_matrices=False)
+    return S[:k], Vt[:k]
+
+# Média de cada coluna em float64 (um DataFrame coluna a coluna, sem convertê-lo inteiro).
+def _media(X) -> np.ndarray:
+    if isinstance(X, MatrizPreditoresMista):
+        return np.concatenate([_media(X.numericas), _media(X.dummies)])
+    if isinstance(X, pd.DataFrame):
+        return X.mean(axis=0).to_numpy(dtype=np.float64)
+    return np.asarray(X.mean(axis=0, dtype=np.float64)).ravel()
+
+# Variância amostral de cada coluna. No caso denso, acumulada por blocos de linhas centralizados; no esparso,
+# por Σx² − n·μ², que preserva a esparsidade.
+def _variancias(X, media: np.ndarray) -> np.ndarray:
+    n = X.shape[0]
+    if isinstance(X, MatrizPreditoresMista):
+        p1 = X.numericas.shape[1]
+        return np.concatenate([_variancias(X.numericas, media[:p1]), _variancias(X.dummies, media[p1:])])
+    if _eh_esparsa(X):
+        quadrados = np.asarray(X.multiply(X).sum(axis=0)).ravel()
+        return np.clip(quadrados - n * media ** 2, 0, None) / (n - 1)
+    soma = np.zeros(X.shape[1])
+    for inicio in range(0, n, _TAMANHO_BLOCO):
+        soma += ((_linhas(X, inicio, inicio + _TAMANHO_BLOCO) - media) ** 2).sum(axis=0)
+    return soma / (n - 1)
+
+# Matriz de covariância amostral, com os mesmos cuidados de memória de '_variancias' (no esparso, XᵀX − n·μμᵀ).
+# Na MatrizPreditoresMista, cada parte tem a sua e o bloco cruzado é Dᵀ·(N − μ), com as numéricas N centralizadas
+# por blocos de linhas (como Σ(N − μ) = 0, a média das dummies D não entra).
+def _covariancia(X, media: np.ndarray) -> np.ndarray:
+    n = X.shape[0]
+    if isinstance(X, MatrizPreditoresMista):
+        p1 = X.numericas.shape[1]
+        covariancia = np.empty((X.shape[1], X.shape[1]))
+        covariancia[:p1, :p1] = _covariancia(X.numericas, media[:p1])
+        covariancia[p1:, p1:] = _covariancia(X.dummies, media[p1:])
+        cruzada = np.zeros((X.shape[1] - p1, p1))
+        for inicio in range(0, n, _TAMANHO_BLOCO):
+            fim = inicio + _TAMANHO_BLOCO
+            cruzada += X.dummies[inicio:fim].T @ (_linhas(X.numericas, inicio, fim) - media[:p1])
+        covariancia[p1:, :p1] = cruzada / (n - 1)
+        covariancia[:p1, p1:] = covariancia[p1:, :p1].T
+        return covariancia
+    if _eh_esparsa(X):
+        gram = (X.T @ X).toarray()
+        return (gram - n * np.outer(media, media)) / (n - 1)
+    comomentos = np.zeros((X.shape[1], X.shape[1]))
+    for inicio in range(0, n, _TAMANHO_BLOCO):
+        centrado = _linhas(X, inicio, inicio + _TAMANHO_BLOCO) - media
+        comomentos += centrado.T @ centrado
+    return comomentos / (n - 1)
+
+# X·M. Uma matriz densa que não é float64 é multiplicada por blocos de linhas (o '@' converteria X inteira antes).
+def _produto(X, M: np.ndarray) -> np.ndarray:
+    if isinstance(X, MatrizPreditoresMista):
+        p1 = X.numericas.shape[1]
+        return _produto(X.numericas, M[:p1]) + X.dummies @ M[p1:]
+    if _eh_esparsa(X) or (isinstance(X, np.ndarray) and X.dtype == np.float64):
+        return X @ M
+    return np.vstack([_linhas(X, inicio, inicio + _TAMANHO_BLOCO) @ M for inicio in range(0, X.shape[0], _TAMANHO_BLOCO)])
+
+# Xᵀ·Q, com os mesmos cuidados de '_produto'.
+def _produto_transposto(X, Q: np.ndarray) -> np.ndarray:
+    if isinstance(X, MatrizPreditoresMista):
+        return np.vstack([_produto_transposto(X.numericas, Q), X.dummies.T @ Q])
+    if _eh_esparsa(X) or (isinstance(X, np.ndarray) and X.dtype == np.float64):
+        return X.T @ Q
+    resultado = np.zeros((X.shape[1], Q.shape[1]))
+    for inicio in range(0, X.shape[0], _TAMANHO_BLOCO):
+        resultado += _linhas(X, inicio, inicio + _TAMANHO_BLOCO).T @ Q[inicio:inicio + _TAMANHO_BLOCO]
+    return resultado
+
+# Linhas [inicio, fim) de uma matriz densa (array, memmap ou DataFrame) como array float64.
+def _linhas(X, inicio: int, fim: int) -> np.ndarray:
+    if isinstance(X, pd.DataFrame):
+        return X.iloc[inicio:fim].to_numpy(dtype=np.float64)
+    return np.asarray(X[inicio:fim], dtype=np.float64)
+
+# Matriz densa usada pelo PCA: as colunas preditoras de uma MatrizCaracteristicas (uma visão quando são consecutivas),
+# um array float32/float64 (inclusive um memmap) ou um DataFrame, todos sem cópia; os blocos de linhas é que são
+# convertidos para float64, ao serem centralizados. Qualquer outra entrada vira um array float64.
+def _matriz_densa(X):
+    if isinstance(X, MatrizCaracteristicas):
+        return X.selecionar(X.colunas_preditoras)
+    if isinstance(X, pd.DataFrame) or (isinstance(X, np.ndarray) and X.dtype in (np.float32, np.float64)):
+        return X
+    return np.asarray(X, dtype=np.float64)
+
+# Uma matriz esparsa só pode ter vindo do scipy.sparse: se ele nem foi importado, X não é esparsa (e não precisamos importá-lo).
+def _eh_esparsa(X) -> bool:
+    sparse = sys.modules.get('scipy.sparse')
+    return sparse is not None and sparse.issparse(X)
+
+# Autovetores são definidos a menos do sinal; fixamos a maior carga (em módulo) de cada componente como positiva
+# para que solvers diferentes devolvam os mesmos componentes.
+def _fixar_sinais(componentes: np.ndarray) -> np.ndarray:
+    maiores = np.argmax(np.abs(componentes), axis=1)
+    sinais = np.sign(componentes[np.arange(len(componentes)), maiores])
+    sinais[sinais == 0] = 1
+    return componentes * sinais[:, None]
+
+
+# Biplot PC1 x PC2 do notebook: os pontos projetados e as cargas como setas. O desenho é feito por
+# 'renderizar_projecao', então acima de 'limite_pontos' linhas os pontos são agregados em pixels ('modo'='auto'/'raster')
+# ou amostrados ('amostra') em vez de um scatter por linha, e os eixos seguem os dados (as setas são escalonadas para
+# o alcance da projeção). Com 'classes', os pontos são coloridos pela classe de cada linha.
+@instrumentar
+def biplot(df_pca: pd.DataFrame, df_loads: pd.DataFrame, caminho_saida: str = 'resultados/figuras_pca/biplot.png', rotulos: dict = None,
+           classes=None, modo: str = 'auto', limite_pontos: int = 50_000) -> 'plt.Figure':
+    return renderizar_projecao(df_pca[['PC1', 'PC2']], classes=classes, cargas=df_loads, caminho_saida=caminho_saida, modo=modo,
+                               limite_pontos=limite_pontos, rotulos=rotulos, titulo="Biplot")
+
+
+# Projeção dos dados em dois componentes, colorida por classe, com as cargas desenhadas como setas (opcional).
+# Recebe a projeção já calculada ('Z', array ou dataframe; 'componentes' escolhe as duas colunas), as classes de cada
+# linha e as cargas no formato de 'PCA.cargas()'. O 'modo' controla o desenho:
+# 'pontos' desenha todas as linhas em uma única chamada ao scatter; 'amostra' desenha uma amostra aleatória de até
+# 'limite_pontos' linhas, estratificada por classe; 'raster' agrega as linhas em uma grade de 'n_bins' x 'n_bins' pixels
+# (um histograma 2D por classe, como no datashader): a cor de cada pixel é a média das cores das classes ponderada pelas
+# contagens e a intensidade cresce com o log da contagem total, então o custo do desenho não depende do número de linhas
+# e regiões densas não ficam saturadas. No modo 'auto' usamos 'pontos' até 'limite_pontos' linhas e 'raster' acima disso.
+@instrumentar
+def renderizar_projecao(Z, classes=None, cargas: pd.DataFrame = None, caminho_saida: str = None, modo: str = 'auto',
+                        limite_pontos: int = 50_000, n_bins: int = 400, componentes: tuple = (0, 1), cores: dict = None,
+                        rotulos: dict = None, semente: int = 0, titulo: str = 'Projeção dos dados nos componentes principais (PCA)') -> 'plt.Figure':
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import to_rgb
+    from matplotlib.patches import Patch
+
+    nomes_eixos = [f'PC{c + 1}' for c in componentes]
+    if isinstance(Z, pd.DataFrame):
+        nomes_eixos = [Z.columns[c] for c in componentes]
+        Z = Z.to_numpy(dtype=np.float64)
+    xy = np.asarray(Z, dtype=np.float64)[:, list(componentes)]
+
+    if classes is not None:
+        classes = pd.Categorical(classes)
+        codigos, categorias = classes.codes.astype(np.int64), list(classes.categories)
+    else:
+        codigos, categorias = np.zeros(len(xy), dtype=np.int64), [None]
+    cores = {**CORES_CLASSES, **(cores or {})}
+    ciclo = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    paleta = np.array([to_rgb(cores.get(c, ciclo[i % len(ciclo)])) for i, c in enumerate(categorias)])
+
+    validos = (codigos >= 0) & ~np.isnan(xy).any(axis=1)
+    xy, codigos = xy[validos], codigos[validos]
+    if modo == 'auto':
+        modo = 'pontos' if len(xy) <= limite_pontos else 'raster'
+
+    fig, ax = plt.subplots(figsize=(9, 7))
+    if modo == 'raster':
+        _desenhar_raster(ax, xy, codigos, paleta, n_bins)
+    elif modo in ('pontos', 'amostra'):
+        if modo == 'amostra' and len(xy) > limite_pontos:
+            linhas = _amostra_por_classe(codigos, len(categorias), limite_pontos, semente)
+            xy, codigos = xy[linhas], codigos[linhas]
+        ax.scatter(xy[:, 0], xy[:, 1], c=paleta[codigos], s=6 if len(xy) > 5_000 else 20, alpha=0.8, linewidths=0)
+    else:
+        raise ValueError(f"Modo desconhecido: '{modo}'. Use 'auto', 'pontos', 'amostra' ou 'raster'.")
+
+    if cargas is not None:
+        _desenhar_cargas(ax, xy, cargas, [nome if isinstance(nome, str) else f'PC{nome + 1}' for nome in nomes_eixos],
+                         ROTULOS_VARIAVEIS if rotulos is None else rotulos)
+    if categorias != [None]:
+        ax.legend(handles=[Patch(color=paleta[i], label=str(c)) for i, c in enumerate(categorias)], title="Classe de Desempenho")
+    ax.axhline(0, color='gray', linewidth=0.8)
+    ax.axvline(0, color='gray', linewidth=0.8)
+    ax.set_xlabel(nomes_eixos[0])
+    ax.set_ylabel(nomes_eixos[1])
+    ax.set_title(titulo)
+    fig.tight_layout()
+
+    if caminho_saida is not None:
+        _criar_pasta(caminho_saida)
+        salvar_figura(caminho_saida, fig, dpi=150)
+    return fig
+
+# Histograma 2D de cada classe com um único 'bincount' sobre o índice combinado (classe, coluna do pixel, linha do pixel),
+# composto em uma imagem RGBA.
+def _desenhar_raster(ax, xy: np.ndarray, codigos: np.ndarray, paleta: np.ndarray, n_bins: int) -> None:
+    if len(xy) == 0:
+        return
+    minimo, maximo = xy.min(axis=0), xy.max(axis=0)
+    maximo = np.where(maximo > minimo, maximo, minimo + 1.0)
+    pixel = np.clip(((xy - minimo) / (maximo - minimo) * n_bins).astype(np.int64), 0, n_bins - 1)
+    combinado = (codigos * n_bins + pixel[:, 1]) * n_bins + pixel[:, 0]
+    contagens = np.bincount(combinado, minlength=len(paleta) * n_bins * n_bins).reshape(len(paleta), n_bins, n_bins)
+
+    total = contagens.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cor = np.einsum('kyx,kc->yxc', contagens, paleta) / total[..., None]
+    imagem = np.zeros((n_bins, n_bins, 4))
+    imagem[..., :3] = np.nan_to_num(cor)
+    imagem[..., 3] = np.log1p(total) / np.log1p(total.max())
+    # Pixels com pelo menos um ponto ficam sempre visíveis.
+    imagem[..., 3] = np.where(total > 0, 0.25 + 0.75 * imagem[..., 3], 0)
+    ax.imshow(imagem, origin='lower', extent=(minimo[0], maximo[0], minimo[1], maximo[1]), aspect='auto', interpolation='nearest')
+
+# Índices de uma amostra de até 'limite' linhas: cada classe tem um mínimo garantido (limite / 4k linhas, ou a classe
+# inteira se for menor) para que classes raras continuem visíveis, e o restante é dividido na proporção do tamanho de cada classe.
+def _amostra_por_classe(codigos: np.ndarray, n_classes: int, limite: int, semente: int) -> np.ndarray:
+    gerador = np.random.default_rng(semente)
+    tamanhos = np.bincount(codigos, minlength=n_classes)
+    minimos = np.minimum(tamanhos, limite // (4 * n_classes))
+    excedentes = tamanhos - minimos
+    cotas = minimos + excedentes * (limite - minimos.sum()) // max(excedentes.sum(), 1)
+    linhas = [gerador.choice(np.flatnonzero(codigos == k), size=min(cotas[k], tamanhos[k]), replace=False)
+              for k in range(n_classes) if tamanhos[k] > 0]
+    return np.sort(np.concatenate(linhas))
+
+# Setas das cargas no mesmo eixo dos pontos, com a maior carga ocupando 80% da maior coordenada projetada.
+def _desenhar_cargas(ax, xy: np.ndarray, cargas: pd.DataFrame, eixos: list, rotulos: dict) -> None:
+    setas = cargas.loc[eixos].to_numpy(dtype=np.float64).T
+    alcance = np.abs(xy).max() if len(xy) else 1.0
+    escala = 0.8 * alcance / max(np.abs(setas).max(), 1e-12)
+    for coluna, (x, y) in zip(cargas.columns, setas * escala):
+        ax.arrow(0, 0, x, y, color='r', alpha=0.5, width=alcance * 0.002, length_includes_head=True)
+        ax.text(x * 1.05, y * 1.05, rotulos.get(coluna, coluna), color='g', fontsize=7, weight='bold', ha='center', va='center')
+
+def _criar_pasta(caminho: str) -> None:
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
@@ -1,25 +1,120 @@
 import os
+import json
+import hashlib
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import skew
+from funcoes_instrumentacao import instrumentar
 
-def carregar_dados(caminho_ou_url: str) -> pd.DataFrame:
+# Com 'tipos_compactos' as colunas qualitativas do dicionário de dados viram 'category' e as quantitativas são
+# reduzidas (inteiros para o menor tipo inteiro, floats para float32). Com 'usar_cache' guardamos uma cópia colunar
+# ao lado do CSV, identificada pelo hash do conteúdo do arquivo, para que as próximas leituras não precisem reinterpretar o texto.
+@instrumentar
+def carregar_dados(caminho_ou_url: str, tipos_compactos: bool = False, usar_cache: bool = False) -> pd.DataFrame:
     try:
-        df = pd.read_csv(caminho_ou_url)
+        caminho_cache = None
+        if usar_cache and os.path.isfile(caminho_ou_url):
+            caminho_cache = _caminho_cache(caminho_ou_url, tipos_compactos)
+            if os.path.exists(caminho_cache):
+                df = _ler_cache(caminho_cache)
+                print("Dados carregados do cache.")
+                return df
+
+        if tipos_compactos:
+            df = pd.read_csv(caminho_ou_url, dtype=obter_mapa_de_tipos())
+            df = _reduzir_tipos_numericos(df)
+        else:
+            df = pd.read_csv(caminho_ou_url)
+
+        if caminho_cache is not None:
+            _escrever_cache(df, caminho_cache)
         print("Dados carregados com sucesso.")
         return df
     except Exception as e:
         print(f"Erro ao carregar os dados: {e}")
         return None
 
+# Monta o mapa de tipos usado no 'read_csv' a partir do dicionário de dados. O 'student_id' fica de fora porque é único
+# por linha e como 'category' ocuparia mais memória do que como texto.
+@instrumentar
+def obter_mapa_de_tipos(df_dict: pd.DataFrame = None) -> dict:
+    if df_dict is None:
+        df_dict = obter_dicionario_de_dados()
+    qualitativas = df_dict[df_dict['tipo'] == 'qualitativa']['variavel']
+    return {coluna: 'category' for coluna in qualitativas if coluna != 'student_id'}
+
+def _reduzir_tipos_numericos(df: pd.DataFrame, df_dict: pd.DataFrame = None) -> pd.DataFrame:
+    if df_dict is None:
+        df_dict = obter_dicionario_de_dados()
+    quantitativas = df_dict[df_dict['tipo'] == 'quantitativa']['variavel']
+    for coluna in quantitativas:
+        if coluna not in df.columns or not pd.api.types.is_numeric_dtype(df[coluna]):
+            continue
+        # Inteiros vão para o menor tipo inteiro que os comporta; todas as colunas float (tanto as contínuas, como
+        # study_hours_per_day, quanto inteiros com nulos, que chegam como float) viram float32, então as estatísticas
+        # calculadas depois sobre elas podem diferir das de float64 a partir da 7ª casa significativa.
+        if pd.api.types.is_integer_dtype(df[coluna]):
+            df[coluna] = pd.to_numeric(df[coluna], downcast='integer')
+        else:
+            df[coluna] = df[coluna].astype('float32')
+    return df
+
+def _hash_arquivo(caminho: str) -> str:
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()[:16]
+
+# Parquet quando o pyarrow estiver instalado; caso contrário, pickle (que também preserva os tipos 'category').
+def _formato_cache() -> str:
+    try:
+        import pyarrow  # noqa: F401
+        return 'parquet'
+    except ImportError:
+        return 'pkl'
+
+# A chave é o hash do CSV; no modo compacto, também o dos tipos (mapa de 'obter_mapa_de_tipos' e quantitativas
+# reduzidas por '_reduzir_tipos_numericos'), para que uma mudança no dicionário de dados não sirva um cache antigo.
+def _caminho_cache(caminho: str, tipos_compactos: bool) -> str:
+    pasta = os.path.join(os.path.dirname(os.path.abspath(caminho)), ".cache_dados")
+    base = os.path.splitext(os.path.basename(caminho))[0]
+    sufixo = "compacto" if tipos_compactos else "padrao"
+    chave = _hash_arquivo(caminho)
+    if tipos_compactos:
+        chave += "-" + _hash_tipos()
+    return os.path.join(pasta, f"{base}_{sufixo}_{chave}.{_formato_cache()}")
+
+def _hash_tipos() -> str:
+    df_dict = obter_dicionario_de_dados()
+    quantitativas = list(df_dict[df_dict['tipo'] == 'quantitativa']['variavel'])
+    tipos = sorted(obter_mapa_de_tipos(df_dict).items())
+    return hashlib.sha256(repr((tipos, quantitativas)).encode()).hexdigest()[:8]
+
+def _ler_cache(caminho_cache: str) -> pd.DataFrame:
+    if caminho_cache.endswith('.parquet'):
+        return pd.read_parquet(caminho_cache)
+    return pd.read_pickle(caminho_cache)
+
+def _escrever_cache(df: pd.DataFrame, caminho_cache: str) -> None:
+    pasta, nome = os.path.split(caminho_cache)
+    os.makedirs(pasta, exist_ok=True)
+    # Remove versões antigas do mesmo arquivo (hash diferente), que não serão mais lidas.
+    prefixo = nome.rsplit('_', 1)[0] + '_'
+    for antigo in os.listdir(pasta):
+        if antigo.startswith(prefixo) and antigo != nome:
+            os.remove(os.path.join(pasta, antigo))
+    if caminho_cache.endswith('.parquet'):
+        df.to_parquet(caminho_cache, index=False)
+    else:
+        df.to_pickle(caminho_cache)
+
+@instrumentar
 def tratar_dados_faltantes(df: pd.DataFrame) -> pd.DataFrame:
     df_tratado = df.copy()
 
     for coluna in df_tratado.columns:
         if df_tratado[coluna].isnull().sum() > 0:
-            if df_tratado[coluna].dtype in ['float64', 'int64']:
+            if pd.api.types.is_numeric_dtype(df_tratado[coluna]):
                 media = df_tratado[coluna].mean()
                 df_tratado[coluna] = df_tratado[coluna].fillna(media)
                 print(f"Nulos em '{coluna}' preenchidos com MÉDIA: {media:.2f}")
@@ -29,16 +124,117 @@ def tratar_dados_faltantes(df: pd.DataFrame) -> pd.DataFrame:
                 print(f"Nulos em '{coluna}' preenchidos com MODA: '{moda}'")
     return df_tratado
 
-def remover_duplicatas(df: pd.DataFrame) -> pd.DataFrame:
-    duplicatas = df.duplicated().sum()
+# Remove linhas repetidas calculando um digesto de 64 bits por linha uma única vez (em vez de comparar todas as colunas
+# duas vezes, no 'duplicated' e no 'drop_duplicates'). Com 'colunas_chave' só essas colunas são comparadas (por exemplo,
+# ['student_id']) e com 'casas_decimais' as colunas float são arredondadas antes, para pegar quase-duplicatas.
+# Fica a primeira ocorrência de cada linha.
+@instrumentar
+def remover_duplicatas(df: pd.DataFrame, colunas_chave: list = None, casas_decimais: int = None) -> pd.DataFrame:
+    repetidas = pd.Series(calcular_digestos_linhas(df, colunas_chave, casas_decimais)).duplicated().to_numpy()
+    duplicatas = int(repetidas.sum())
     if duplicatas > 0:
-        df_sem_duplicatas = df.drop_duplicates(ignore_index=True)
+        df_sem_duplicatas = df[~repetidas].reset_index(drop=True)
         print(f"{duplicatas} linhas duplicadas foram removidas.")
         return df_sem_duplicatas
     else:
         print("Nenhuma linha duplicada encontrada.")
         return df
 
+# Digesto (uint64) de cada linha, com o 'hash_pandas_object'. Linhas iguais têm o mesmo digesto; linhas diferentes
+# colidem com probabilidade desprezível (da ordem de n²/2⁶⁵ para n linhas únicas).
+# Com 'casas_decimais', floats são arredondados (e -0.0 vira 0.0) antes do hash.
+def calcular_digestos_linhas(df: pd.DataFrame, colunas_chave: list = None, casas_decimais: int = None) -> np.ndarray:
+    dados = df if colunas_chave is None else df[colunas_chave]
+    if casas_decimais is not None:
+        floats = [coluna for coluna in dados.columns if dados[coluna].dtype.kind == 'f']
+        if floats:
+            dados = dados.copy()
+            for coluna in floats:
+                dados[coluna] = dados[coluna].round(casas_decimais) + 0.0
+    return pd.util.hash_pandas_object(dados, index=False).to_numpy()
+
+# Remoção de duplicatas incremental, bloco a bloco (por exemplo, de um CSV lido em blocos ou de vários arquivos
+# chegando ao longo do tempo). Os digestos já vistos (8 bytes por linha única) ficam em alguns arrays uint64 ordenados,
+# consultados por busca binária: os novos digestos de cada bloco entram como um array pequeno, que é fundido com o
+# anterior quando fica do mesmo tamanho (a ordenação estável do NumPy funde duas sequências ordenadas em tempo linear).
+# Assim cada digesto é copiado O(log n) vezes, em vez de o array inteiro ser copiado a cada bloco, e há no máximo
+# log2(n) arrays para consultar.
+# O conjunto pode ser salvo em .npz (com as 'colunas_chave' e as 'casas_decimais') e carregado em outra execução.
+class DeduplicadorIncremental:
+
+    def __init__(self, colunas_chave: list = None, casas_decimais: int = None):
+        self.colunas_chave = list(colunas_chave) if colunas_chave is not None else None
+        self.casas_decimais = casas_decimais
+        self._niveis = []
+        self.linhas = 0
+        self.duplicatas = 0
+
+    # Máscara das linhas do bloco que ainda não tinham aparecido (nem antes nem no próprio bloco).
+    def filtrar(self, bloco: pd.DataFrame) -> np.ndarray:
+        return self.filtrar_digestos(calcular_digestos_linhas(bloco, self.colunas_chave, self.casas_decimais))
+
+    # Os digestos do bloco são ordenados uma vez (ordenação estável, então a primeira ocorrência de cada valor vem
+    # antes das repetições): as buscas com valores ordenados são bem mais rápidas e os novos já saem ordenados.
+    def filtrar_digestos(self, digestos: np.ndarray) -> np.ndarray:
+        ordem = np.argsort(digestos, kind='stable')
+        ordenados = digestos[ordem]
+        repetidas = np.empty(len(ordenados), dtype=bool)
+        repetidas[:1] = False
+        repetidas[1:] = ordenados[1:] == ordenados[:-1]
+        for nivel in self._niveis:
+            posicoes = np.searchsorted(nivel, ordenados)
+            repetidas |= nivel[np.minimum(posicoes, len(nivel) - 1)] == ordenados
+
+        novas = np.ones(len(digestos), dtype=bool)
+        novas[ordem[repetidas]] = False
+        self._acrescentar(ordenados[~repetidas])
+        self.linhas += len(digestos)
+        self.duplicatas += len(digestos) - int(novas.sum())
+        return novas
+
+    # Os arrays ficam em ordem decrescente de tamanho; um array novo é fundido com o anterior enquanto for pelo menos
+    # do mesmo tamanho (os digestos de arrays diferentes nunca se repetem).
+    def _acrescentar(self, novos: np.ndarray) -> None:
+        if len(novos) == 0:
+            return
+        self._niveis.append(novos)
+        while len(self._niveis) > 1 and len(self._niveis[-1]) >= len(self._niveis[-2]):
+            ultimo = self._niveis.pop()
+            self._niveis[-1] = np.sort(np.concatenate([self._niveis[-1], ultimo]), kind='stable')
+
+    # Todos os digestos vistos, em um único array ordenado.
+    @property
+    def digestos(self) -> np.ndarray:
+        if len(self._niveis) > 1:
+            self._niveis = [np.sort(np.concatenate(self._niveis), kind='stable')]
+        return self._niveis[0] if self._niveis else np.empty(0, dtype=np.uint64)
+
+    @property
+    def unicas(self) -> int:
+        return sum(len(nivel) for nivel in self._niveis)
+
+    def _configuracao(self) -> dict:
+        return {'colunas_chave': self.colunas_chave, 'casas_decimais': self.casas_decimais}
+
+    # Gravado pelo arquivo aberto para que o np.savez não acrescente '.npz' a um caminho com outra extensão.
+    # A configuração vai junto (como texto JSON) porque digestos calculados com outras colunas ou outro arredondamento
+    # nunca coincidem com os novos, e as duplicatas entre execuções passariam sem aviso.
+    def salvar(self, caminho: str) -> None:
+        with open(caminho, 'wb') as f:
+            np.savez(f, digestos=self.digestos, configuracao=np.array(json.dumps(self._configuracao())))
+
+    @classmethod
+    def carregar(cls, caminho: str, colunas_chave: list = None, casas_decimais: int = None) -> 'DeduplicadorIncremental':
+        deduplicador = cls(colunas_chave, casas_decimais)
+        with np.load(caminho) as arquivo:
+            salva = json.loads(str(arquivo['configuracao']))
+            if salva != deduplicador._configuracao():
+                raise ValueError(f"Os digestos em '{caminho}' foram calculados com {salva}, "
+                                 f"mas foram pedidos {deduplicador._configuracao()}.")
+            deduplicador._acrescentar(arquivo['digestos'])
+        return deduplicador
+
+@instrumentar
 def remover_outliers(df: pd.DataFrame, coluna):
     Q1 = df[coluna].quantile(0.25)
     Q3 = df[coluna].quantile(0.75)
@@ -48,19 +244,173 @@ def remover_outliers(df: pd.DataFrame, coluna):
     df_sem_outliers = df[(df[coluna] >= lim_inf) & (df[coluna] <= lim_sup)]
     return df_sem_outliers
 
-def discretizar_variavel_alvo(df: pd.DataFrame) -> pd.DataFrame:
-    df_discretizado = df.copy()
-    bins = [0, 40, 70, 90, 101]
-    labels = ['Reprovado', 'Recuperação', 'Bom', 'Excelente']
-    df_discretizado['performance_class'] = pd.cut(
-        df_discretizado['exam_score'], 
-        bins=bins, 
-        labels=labels, 
-        right=False
-    )
-    print("Coluna 'performance_class' criada a partir de 'exam_score'.")
+# Versão para várias colunas de uma vez. Os limites de cada coluna vêm de 'limites_outliers' e a filtragem é feita
+# com uma única máscara combinada, em vez de uma cópia filtrada por coluna. Assim como em 'remover_outliers', os
+# limites de todas as colunas são calculados sobre o mesmo dataframe (e não sobre o resultado da coluna anterior)
+# e linhas com valor ausente em alguma das colunas também saem.
+@instrumentar
+def remover_outliers_multiplas(df: pd.DataFrame, colunas: list, metodo: str = 'iqr', fator: float = 1.5, limiar: float = 3.5) -> pd.DataFrame:
+    mascara, _ = mascara_outliers(df, colunas, metodo=metodo, fator=fator, limiar=limiar)
+    return df[mascara]
+
+# Limites inferior e superior de cada coluna, calculados de uma vez sobre o bloco numérico:
+# - 'iqr': Q1 - fator·IQR e Q3 + fator·IQR, com todos os quartis em uma única chamada de 'quantile';
+# - 'mad': z-score robusto, |0,6745·(x - mediana) / MAD| <= limiar, ou seja, mediana ± limiar·MAD/0,6745.
+#   Em colunas inteiras ou com poucos valores distintos o MAD costuma ser 0 (mais da metade dos valores igual à mediana),
+#   e aí todo valor diferente da mediana seria outlier. Nesses casos usamos 1,253314·(desvio absoluto médio em torno da
+#   mediana) como escala, que é o substituto usual do MAD/0,6745 (Iglewicz e Hoaglin).
+@instrumentar
+def limites_outliers(df: pd.DataFrame, colunas: list, metodo: str = 'iqr', fator: float = 1.5, limiar: float = 3.5) -> pd.DataFrame:
+    if metodo == 'iqr':
+        quartis = df[colunas].quantile([0.25, 0.75])
+        return _limites_iqr(quartis.loc[0.25].to_numpy(), quartis.loc[0.75].to_numpy(), colunas, fator)
+    if metodo == 'mad':
+        mediana = df[colunas].median()
+        desvios = (df[colunas] - mediana).abs()
+        return _limites_mad(mediana.to_numpy(), desvios.median().to_numpy(), desvios.mean().to_numpy(), colunas, limiar)
+    raise ValueError(f"Método desconhecido: '{metodo}'. Use 'iqr' ou 'mad'.")
+
+def _limites_iqr(q1: np.ndarray, q3: np.ndarray, colunas: list, fator: float) -> pd.DataFrame:
+    iqr = q3 - q1
+    return pd.DataFrame({'Limite inferior': q1 - fator * iqr, 'Limite superior': q3 + fator * iqr}, index=colunas)
+
+def _limites_mad(mediana: np.ndarray, mad: np.ndarray, desvio_medio: np.ndarray, colunas: list, limiar: float) -> pd.DataFrame:
+    escala = np.where(mad > 0, mad / 0.6745, 1.253314 * desvio_medio)
+    raio = limiar * escala
+    return pd.DataFrame({'Limite inferior': mediana - raio, 'Limite superior': mediana + raio}, index=colunas)
+
+# Máscara das linhas que ficam (True = dentro dos limites em todas as colunas) e a contagem de outliers por coluna,
+# sem copiar o dataframe. Os limites podem vir prontos em 'limites' (por exemplo, de 'limites_outliers_em_blocos',
+# para filtrar um arquivo grande bloco a bloco).
+@instrumentar
+def mascara_outliers(df: pd.DataFrame, colunas: list, metodo: str = 'iqr', fator: float = 1.5, limiar: float = 3.5, limites: pd.DataFrame = None) -> tuple:
+    if limites is None:
+        limites = limites_outliers(df, colunas, metodo, fator, limiar)
+    valores = df[colunas].to_numpy(dtype=np.float64, na_value=np.nan)
+    inferior = limites.loc[colunas, 'Limite inferior'].to_numpy()
+    superior = limites.loc[colunas, 'Limite superior'].to_numpy()
+    abaixo = valores < inferior
+    acima = valores > superior
+    dentro = (valores >= inferior) & (valores <= superior)
+    contagens = pd.Series((abaixo | acima).sum(axis=0), index=colunas, name='Outliers')
+    return dentro.all(axis=1), contagens
+
+# Limites calculados lendo o CSV em blocos, com quantis aproximados pelo EsbocoQuantis (exatos enquanto cada coluna
+# tiver até 'max_centroides' valores distintos). O método 'mad' precisa de duas passadas: uma para a mediana
+# e outra para a mediana (e a média, usada quando o MAD é 0) dos desvios absolutos.
+@instrumentar
+def limites_outliers_em_blocos(caminho_ou_url: str, colunas: list, metodo: str = 'iqr', fator: float = 1.5, limiar: float = 3.5,
+                               tamanho_bloco: int = 100_000, max_centroides: int = 2048) -> pd.DataFrame:
+    from funcoes_esbocos import EsbocoQuantis
+
+    if metodo not in ('iqr', 'mad'):
+        raise ValueError(f"Método desconhecido: '{metodo}'. Use 'iqr' ou 'mad'.")
+
+    esbocos = [EsbocoQuantis(max_centroides) for _ in colunas]
+    for bloco in pd.read_csv(caminho_ou_url, usecols=colunas, chunksize=tamanho_bloco):
+        for coluna, esboco in zip(colunas, esbocos):
+            esboco.atualizar(bloco[coluna].to_numpy(dtype=np.float64, na_value=np.nan))
+
+    if metodo == 'iqr':
+        q1 = np.array([esboco.quantil(0.25) for esboco in esbocos])
+        q3 = np.array([esboco.quantil(0.75) for esboco in esbocos])
+        return _limites_iqr(q1, q3, colunas, fator)
+
+    mediana = np.array([esboco.quantil(0.5) for esboco in esbocos])
+    desvios = [EsbocoQuantis(max_centroides) for _ in colunas]
+    somas, contagens = np.zeros(len(colunas)), np.zeros(len(colunas))
+    for bloco in pd.read_csv(caminho_ou_url, usecols=colunas, chunksize=tamanho_bloco):
+        for j, (coluna, esboco) in enumerate(zip(colunas, desvios)):
+            absolutos = np.abs(bloco[coluna].to_numpy(dtype=np.float64, na_value=np.nan) - mediana[j])
+            esboco.atualizar(absolutos)
+            somas[j] += np.nansum(absolutos)
+            contagens[j] += np.count_nonzero(~np.isnan(absolutos))
+    mad = np.array([esboco.quantil(0.5) for esboco in desvios])
+    return _limites_mad(mediana, mad, somas / np.maximum(contagens, 1), colunas, limiar)
+
+# Faixas de 'exam_score' usadas para criar a 'performance_class' (intervalos fechados à esquerda).
+BINS_PERFORMANCE = [0, 40, 70, 90, 101]
+LABELS_PERFORMANCE = ['Reprovado', 'Recuperação', 'Bom', 'Excelente']
+
+# Cria a coluna 'performance_class' a partir do 'exam_score'. Por padrão usa as faixas BINS_PERFORMANCE e os rótulos
+# LABELS_PERFORMANCE; outras faixas podem ser passadas em 'bins' (bordas, intervalos fechados à esquerda como no
+# pd.cut com right=False) ou em 'quantis' (probabilidades, por exemplo [0, 0.25, 0.5, 0.75, 1], ou o número de
+# classes de mesma frequência). Com 'inplace' a coluna é adicionada ao próprio df, sem copiá-lo.
+@instrumentar
+def discretizar_variavel_alvo(df: pd.DataFrame, bins: list = None, labels: list = None, quantis=None,
+                              coluna: str = 'exam_score', coluna_saida: str = 'performance_class', inplace: bool = False) -> pd.DataFrame:
+    df_discretizado = df if inplace else df.copy()
+    df_discretizado[coluna_saida] = discretizar_valores(df_discretizado[coluna], bins, labels, quantis)
+    print(f"Coluna '{coluna_saida}' criada a partir de '{coluna}'.")
     return df_discretizado
 
+# Versão sem dataframe: devolve só a coluna categórica ordenada (o mesmo tipo produzido pelo pd.cut com rótulos).
+def discretizar_valores(valores, bins: list = None, labels: list = None, quantis=None) -> pd.Categorical:
+    valores = np.asarray(valores, dtype=np.float64)
+    if bins is None and quantis is None:
+        bins, labels = BINS_PERFORMANCE, labels if labels is not None else LABELS_PERFORMANCE
+    ordenados = np.sort(valores[~np.isnan(valores)]) if bins is None else None
+    bordas = _bordas_faixas(ordenados, bins, quantis)
+    labels = labels if labels is not None else _rotulos_padrao(bordas)
+    if len(labels) != len(bordas) - 1:
+        raise ValueError(f"São {len(bordas) - 1} faixas e {len(labels)} rótulos.")
+    return pd.Categorical.from_codes(codigos_faixas(valores, bordas), categories=labels, ordered=True)
+
+# Índice da faixa de cada valor por busca binária nas bordas: a faixa i é [bordas[i], bordas[i+1]).
+# Valores fora de todas as faixas e NaN recebem -1.
+def codigos_faixas(valores, bordas) -> np.ndarray:
+    valores = np.asarray(valores, dtype=np.float64)
+    bordas = np.asarray(bordas, dtype=np.float64)
+    codigos = np.searchsorted(bordas, valores, side='right') - 1
+    codigos[(codigos >= len(bordas) - 1) | np.isnan(valores)] = -1
+    return codigos
+
+# Contagem de cada classe em vários esquemas de discretização de uma vez: os valores são ordenados uma única vez e,
+# em cada esquema, a contagem de cada faixa é a diferença entre as posições das bordas no array ordenado (searchsorted).
+# 'esquemas' é um dicionário {nome: {'bins': [...] ou 'quantis': ..., 'labels': [...] (opcional)}} (ou {nome: [bordas]}).
+# Devolve {nome: tabela com 'Contagem' e 'Proporção (%)' por classe}.
+@instrumentar
+def avaliar_esquemas_discretizacao(df: pd.DataFrame, esquemas: dict, coluna: str = 'exam_score') -> dict:
+    valores = df[coluna].to_numpy(dtype=np.float64, na_value=np.nan)
+    ordenados = np.sort(valores[~np.isnan(valores)])
+
+    resultados = {}
+    for nome, esquema in esquemas.items():
+        if not isinstance(esquema, dict):
+            esquema = {'bins': esquema}
+        bordas = _bordas_faixas(ordenados, esquema.get('bins'), esquema.get('quantis'))
+        labels = esquema.get('labels') or _rotulos_padrao(bordas)
+        contagens = np.diff(np.searchsorted(ordenados, bordas, side='left'))
+        resultados[nome] = pd.DataFrame({
+            'Contagem': contagens,
+            'Proporção (%)': contagens / max(contagens.sum(), 1) * 100
+        }, index=pd.Index(labels, name=nome))
+    return resultados
+
+# Bordas das faixas a partir das bordas dadas ou de quantis dos valores ('ordenados' já sem NaN e em ordem crescente).
+# Nos quantis a última borda é empurrada para logo acima do máximo, para que ele caia na última faixa.
+def _bordas_faixas(ordenados: np.ndarray, bins: list = None, quantis=None) -> np.ndarray:
+    if bins is not None:
+        return np.asarray(bins, dtype=np.float64)
+    if np.isscalar(quantis):
+        quantis = np.linspace(0, 1, int(quantis) + 1)
+    if len(ordenados) == 0:
+        raise ValueError("Não há valores para calcular os quantis.")
+    # Quantil com interpolação linear, direto do array já ordenado.
+    posicoes = (len(ordenados) - 1) * np.asarray(quantis, dtype=np.float64)
+    baixo = np.floor(posicoes).astype(np.int64)
+    alto = np.minimum(baixo + 1, len(ordenados) - 1)
+    bordas = ordenados[baixo] + (ordenados[alto] - ordenados[baixo]) * (posicoes - baixo)
+    if quantis[-1] == 1:
+        bordas[-1] = np.nextafter(bordas[-1], np.inf)
+    if np.any(np.diff(bordas) <= 0):
+        raise ValueError(f"Os quantis {list(quantis)} geram bordas repetidas: {bordas.tolist()}.")
+    return bordas
+
+def _rotulos_padrao(bordas: np.ndarray) -> list:
+    return [f"[{inicio:g}, {fim:g})" for inicio, fim in zip(bordas[:-1], bordas[1:])]
+
+@instrumentar
 def obter_dicionario_de_dados() -> pd.DataFrame:
     lista_de_variaveis = [
         {"variavel": "student_id", "descricao": "Identificador único para cada estudante.", "tipo": "qualitativa", "subtipo": "nominal"},
@@ -83,13 +433,82 @@ def obter_dicionario_de_dados() -> pd.DataFrame:
     ]
     return pd.DataFrame(lista_de_variaveis)
 
-def salvar_dataframe_processado(df: pd.DataFrame) -> None:
+# Codificação one-hot (drop_first, mesma ordem de colunas do pd.get_dummies) em formato compacto: dummies em uint8
+# (1 byte por célula, no lugar do int64 do notebook) ou, com 'esparso', uma matriz esparsa CSR do scipy, que só guarda
+# as posições iguais a 1. Devolve a matriz de dummies e a lista com os nomes das colunas.
+@instrumentar
+def codificar_one_hot(df: pd.DataFrame, colunas_categoricas: list, esparso: bool = False) -> tuple:
+    if not esparso:
+        dummies = pd.get_dummies(df[colunas_categoricas], drop_first=True, dtype=np.uint8)
+        return dummies, list(dummies.columns)
+
+    from scipy import sparse
+
+    linhas, colunas, nomes = [], [], []
+    for coluna in colunas_categoricas:
+        codigos, categorias = pd.factorize(df[coluna], sort=True)
+        # O código 0 é a categoria descartada pelo drop_first; ausentes (-1) ficam com todas as dummies zeradas.
+        presentes = np.flatnonzero(codigos > 0)
+        linhas.append(presentes)
+        colunas.append(len(nomes) + codigos[presentes] - 1)
+        nomes.extend(f"{coluna}_{categoria}" for categoria in categorias[1:])
+
+    linhas = np.concatenate(linhas) if linhas else np.empty(0, dtype=np.int64)
+    colunas = np.concatenate(colunas) if colunas else np.empty(0, dtype=np.int64)
+    dummies = sparse.csr_matrix((np.ones(len(linhas), dtype=np.uint8), (linhas, colunas)), shape=(len(df), len(nomes)))
+    return dummies, nomes
+
+# Matriz de preditores do PCA: colunas numéricas seguidas das dummies das categóricas. No modo denso é um DataFrame
+# (numéricas no tipo original e dummies em uint8); no esparso, uma MatrizPreditoresMista (numéricas densas e dummies
+# em CSR). Devolve a matriz e os nomes das colunas, que podem ir direto para funcoes_pca.PCA().fit(X, nomes) sem criar
+# cópias centralizadas ou escalonadas (nem uma cópia float64 do DataFrame inteiro).
+@instrumentar
+def montar_matriz_preditores(df: pd.DataFrame, colunas_numericas: list, colunas_categoricas: list, esparso: bool = False) -> tuple:
+    dummies, nomes_dummies = codificar_one_hot(df, colunas_categoricas, esparso)
+    nomes = list(colunas_numericas) + nomes_dummies
+    if not esparso:
+        return pd.concat([df[colunas_numericas], dummies], axis=1), nomes
+    return MatrizPreditoresMista(df[colunas_numericas].to_numpy(dtype=np.float64), dummies), nomes
+
+# Matriz de preditores do modo esparso. As colunas numéricas são densas em quase todas as linhas, e na CSR cada valor
+# ainda carrega o índice da coluna (cerca de 1,5x a memória densa); por isso só as dummies ficam esparsas e as
+# numéricas ficam em um array float64 ao lado. O PCA combina as duas partes nos produtos e na matriz de Gram.
+class MatrizPreditoresMista:
+
+    def __init__(self, numericas: np.ndarray, dummies):
+        self.numericas = numericas
+        self.dummies = dummies
+
+    @property
+    def shape(self) -> tuple:
+        return (self.numericas.shape[0], self.numericas.shape[1] + self.dummies.shape[1])
+
+    def __len__(self) -> int:
+        return self.numericas.shape[0]
+
+    # Só fatias de linhas (usadas para percorrer a matriz em blocos).
+    def __getitem__(self, linhas: slice) -> 'MatrizPreditoresMista':
+        return MatrizPreditoresMista(self.numericas[linhas], self.dummies[linhas])
+
+    def toarray(self) -> np.ndarray:
+        return np.hstack([np.asarray(self.numericas, dtype=np.float64), self.dummies.toarray()])
+
+def _caminho_padrao_processado() -> str:
     proj_root = os.path.abspath(os.path.join(os.getcwd(), ".."))
-    caminho_dados = os.path.join(proj_root, "dados", "student_habits_preprocessed.csv")
+    return os.path.join(proj_root, "dados", "student_habits_preprocessed.csv")
+
+# Sem 'caminho', salva em dados/ relativo à pasta acima da atual (a pasta dos notebooks).
+@instrumentar
+def salvar_dataframe_processado(df: pd.DataFrame, caminho: str = None) -> None:
+    caminho_dados = caminho or _caminho_padrao_processado()
     df.to_csv(caminho_dados, index=False)
     print(f"Arquivo salvo em: {caminho_dados}")
 
-def executar_pre_processamento_completo(caminho_ou_url: str) -> pd.DataFrame:
+# Com 'pasta_matriz', também grava a matriz de características (quantitativas + dummies, em 'dtype_matriz') e os
+# códigos da performance_class como .npy, para as etapas seguintes lerem por memmap (veja funcoes_matriz).
+@instrumentar
+def executar_pre_processamento_completo(caminho_ou_url: str, caminho_saida: str = None, pasta_matriz: str = None,
+                                        dtype_matriz=np.float32) -> pd.DataFrame:
     df = carregar_dados(caminho_ou_url)
     if df is None:
         return None
@@ -97,6 +516,102 @@ def executar_pre_processamento_completo(caminho_ou_url: str) -> pd.DataFrame:
     df = tratar_dados_faltantes(df)
     df = remover_duplicatas(df)
     df = discretizar_variavel_alvo(df)
-    salvar_dataframe_processado(df)
+    salvar_dataframe_processado(df, caminho_saida)
+    if pasta_matriz is not None:
+        from funcoes_matriz import montar_matriz_caracteristicas
+        montar_matriz_caracteristicas(df, pasta_matriz, dtype=dtype_matriz, df_dict=obter_dicionario_de_dados())
     
     return df
+
+# Versão em blocos do pré-processamento completo, para arquivos que não cabem na memória.
+# Fazemos duas passadas pelo CSV: a primeira só acumula somas/contagens (para a média) e frequências (para a moda),
+# a segunda imputa, remove duplicatas pelos digestos das linhas (DeduplicadorIncremental), discretiza e grava o resultado aos poucos.
+# O pico de memória fica limitado pelo tamanho do bloco (mais os digestos, 8 bytes por linha única).
+# 'colunas_chave' e 'casas_decimais' têm o mesmo papel que em 'remover_duplicatas'.
+@instrumentar
+def executar_pre_processamento_em_blocos(caminho_ou_url: str, caminho_saida: str = None, tamanho_bloco: int = 100_000,
+                                         colunas_chave: list = None, casas_decimais: int = None, caminho_digestos: str = None) -> str:
+    if caminho_saida is None:
+        caminho_saida = _caminho_padrao_processado()
+
+    # 1ª passada: estatísticas de imputação.
+    try:
+        leitor = pd.read_csv(caminho_ou_url, chunksize=tamanho_bloco)
+        somas, contagens, nulos, frequencias = {}, {}, {}, {}
+        numericas, com_float, com_bloco_numerico = {}, set(), set()
+        for bloco in leitor:
+            for coluna in bloco.columns:
+                serie = bloco[coluna]
+                nulos[coluna] = nulos.get(coluna, 0) + int(serie.isnull().sum())
+                # Uma coluna só é numérica se for numérica em todos os blocos (como seria na leitura completa).
+                numericas[coluna] = numericas.get(coluna, True) and pd.api.types.is_numeric_dtype(serie)
+                if pd.api.types.is_numeric_dtype(serie):
+                    com_bloco_numerico.add(coluna)
+                if numericas[coluna]:
+                    if serie.dtype.kind == 'f':
+                        com_float.add(coluna)
+                    somas[coluna] = somas.get(coluna, 0.0) + float(serie.sum())
+                    contagens[coluna] = contagens.get(coluna, 0) + int(serie.count())
+                else:
+                    freq = serie.value_counts()
+                    frequencias[coluna] = freq if coluna not in frequencias else frequencias[coluna].add(freq, fill_value=0)
+
+        # Colunas mistas (numéricas em alguns blocos e texto em outros) são texto na leitura completa, mas as frequências
+        # dos blocos numéricos ficaram de fora (ou com os valores já convertidos). Relemos só essas colunas como texto.
+        mistas = [coluna for coluna, eh_numerica in numericas.items() if not eh_numerica and coluna in com_bloco_numerico]
+        if mistas:
+            frequencias.update({coluna: pd.Series(dtype='int64') for coluna in mistas})
+            for bloco in pd.read_csv(caminho_ou_url, chunksize=tamanho_bloco, usecols=mistas, dtype=str):
+                for coluna in mistas:
+                    frequencias[coluna] = frequencias[coluna].add(bloco[coluna].value_counts(), fill_value=0)
+    except Exception as e:
+        print(f"Erro ao carregar os dados: {e}")
+        return None
+
+    # As colunas mistas são lidas como texto também na 2ª passada, para que todos os blocos tenham o mesmo tipo.
+    valores_imputacao, tipos = {}, {coluna: str for coluna in mistas}
+    for coluna, eh_numerica in numericas.items():
+        if eh_numerica:
+            # Colunas inteiras com nulos viram float na leitura completa, então forçamos o mesmo tipo em todos os blocos.
+            if coluna in com_float or nulos[coluna] > 0:
+                tipos[coluna] = 'float64'
+            if nulos[coluna] > 0:
+                media = somas[coluna] / contagens[coluna]
+                valores_imputacao[coluna] = media
+                print(f"Nulos em '{coluna}' preenchidos com MÉDIA: {media:.2f}")
+        elif nulos[coluna] > 0:
+            # Mesmo critério de 'mode()[0]': maior frequência e, no empate, o menor valor.
+            freq = frequencias[coluna]
+            moda = sorted(freq[freq == freq.max()].index)[0]
+            valores_imputacao[coluna] = moda
+            print(f"Nulos em '{coluna}' preenchidos com MODA: '{moda}'")
+
+    # 2ª passada: imputação, remoção de duplicatas, discretização e escrita incremental.
+    # Com 'caminho_digestos', as linhas já vistas em execuções anteriores (outros arquivos) também contam como duplicatas
+    # e o conjunto atualizado é salvo no fim.
+    if caminho_digestos is not None and os.path.exists(caminho_digestos):
+        deduplicador = DeduplicadorIncremental.carregar(caminho_digestos, colunas_chave, casas_decimais)
+    else:
+        deduplicador = DeduplicadorIncremental(colunas_chave, casas_decimais)
+    linhas = 0
+    primeiro = True
+    for bloco in pd.read_csv(caminho_ou_url, chunksize=tamanho_bloco, dtype=tipos):
+        if valores_imputacao:
+            bloco = bloco.fillna(valores_imputacao)
+
+        bloco = bloco[deduplicador.filtrar(bloco)]
+
+        bloco['performance_class'] = discretizar_valores(bloco['exam_score'])
+        bloco.to_csv(caminho_saida, mode='w' if primeiro else 'a', header=primeiro, index=False)
+        primeiro = False
+        linhas += len(bloco)
+
+    if caminho_digestos is not None:
+        deduplicador.salvar(caminho_digestos)
+    if deduplicador.duplicatas > 0:
+        print(f"{deduplicador.duplicatas} linhas duplicadas foram removidas.")
+    else:
+        print("Nenhuma linha duplicada encontrada.")
+    print("Coluna 'performance_class' criada a partir de 'exam_score'.")
+    print(f"{linhas} linhas salvas em: {caminho_saida}")
+    return caminho_saida
@@ -0,0 +1,110 @@
+# Neste arquivo temos a geração das figuras da análise univariada e bivariada sem Jupyter: cada figura é montada pelas
+# funções 'construir_*' dos outros módulos no backend Agg (sem janela), salva direto em disco e as figuras são
+# distribuídas entre vários processos. Para cada figura medimos o tempo de construção e de gravação.
+# O dataframe chega aos processos em memória compartilhada (veja funcoes_paralelo), sem ser serializado.
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import matplotlib.pyplot as plt
+import funcoes_analise_uni as au
+import funcoes_analise_bi as ab
+from funcoes_instrumentacao import salvar_figura
+from funcoes_paralelo import DataFrameCompartilhado, reconstruir_dataframe
+
+
+# Colunas da tabela de tempos devolvida por 'renderizar_figuras' (também quando não há nenhuma tarefa).
+COLUNAS_TEMPOS = ['Figura', 'Construção (s)', 'Gravação (s)', 'Total (s)', 'Caminho']
+
+# Dataframe usado pelas tarefas de cada processo. Ele é remontado uma única vez por processo (no inicializador),
+# a partir da memória compartilhada, e não enviado uma vez por figura.
+_df_processo = None
+
+
+def _iniciar_processo(descritor: dict) -> None:
+    global _df_processo
+    plt.switch_backend('Agg')
+    _df_processo = reconstruir_dataframe(descritor)
+
+
+# Cada tarefa é uma tupla (nome do arquivo, função construtora, argumentos nomeados da construtora).
+def _renderizar(tarefa: tuple, pasta_saida: str) -> dict:
+    nome, construtora, argumentos = tarefa
+    caminho = os.path.join(pasta_saida, f"{nome}.png")
+
+    inicio = time.perf_counter()
+    fig = construtora(_df_processo, **argumentos)
+    construida = time.perf_counter()
+    if fig is not None:
+        salvar_figura(caminho, fig, bbox_inches='tight')
+        plt.close(fig)
+    salva = time.perf_counter()
+
+    return {
+        'Figura': nome,
+        'Construção (s)': construida - inicio,
+        'Gravação (s)': salva - construida,
+        'Total (s)': salva - inicio,
+        'Caminho': caminho if fig is not None else None
+    }
+
+
+# Lista de tarefas com as figuras da análise univariada (uma figura condicional por variável quantitativa).
+def tarefas_univariadas(df: pd.DataFrame, df_dict: pd.DataFrame, coluna_alvo: str = 'performance_class') -> list:
+    quantitativas, qualitativas = au.separar_variaveis(df_dict)
+    classes = list(df[coluna_alvo].dropna().unique())
+    tarefas = [
+        ('univariada_quantitativas', au.construir_matriz_univariada_quantitativa, {'colunas': quantitativas}),
+        ('univariada_qualitativas', au.construir_matriz_univariada_qualitativa, {'colunas': qualitativas}),
+        ('condicional_qualitativas', au.construir_matriz_condicional_qualitativa, {'colunas_qual': qualitativas, 'coluna_alvo': coluna_alvo}),
+    ]
+    for coluna in quantitativas:
+        tarefas.append((f'condicional_{coluna}', au.construir_figura_condicional_quantitativa,
+                        {'coluna': coluna, 'coluna_alvo': coluna_alvo, 'classes': classes}))
+    return tarefas
+
+
+# Lista de tarefas com as figuras da análise bivariada, com os mesmos nomes de arquivo usados pelas funções do funcoes_analise_bi.
+def tarefas_bivariadas(df_dict: pd.DataFrame) -> list:
+    quantitativas, qualitativas = ab.separar_variaveis(df_dict)
+    return [
+        ('bivariada_quantxquant_colorida', ab.construir_comparacao_quantitativas, {'quantitativas': quantitativas}),
+        ('heatmap_global_quantxquant', ab.construir_heatmap_quantitativas, {'quantitativas': quantitativas}),
+        ('bivariada_qualxqual_sem_perf', ab.construir_qualitativas_sem_perf, {'qualitativas': qualitativas}),
+        ('qualitativa_vs_performance', ab.construir_qualitativas_vs_performance, {'qualitativas': qualitativas}),
+    ]
+
+
+# Renderiza as tarefas em 'n_processos' processos (None usa todos os núcleos; 1 roda no próprio processo, sem pool)
+# e devolve uma tabela com o tempo de cada figura, na mesma ordem das tarefas. No próprio processo, o backend também
+# passa a ser o Agg durante a renderização e depois volta ao anterior (por exemplo, o inline do Jupyter).
+def renderizar_figuras(df: pd.DataFrame, tarefas: list, pasta_saida: str, n_processos: int = None) -> pd.DataFrame:
+    os.makedirs(pasta_saida, exist_ok=True)
+    if not tarefas:
+        print(f"Nenhuma figura para salvar em: {pasta_saida}")
+        return pd.DataFrame(columns=COLUNAS_TEMPOS)
+
+    if n_processos == 1:
+        global _df_processo
+        anterior, backend = _df_processo, plt.get_backend()
+        _df_processo = df
+        plt.switch_backend('Agg')
+        try:
+            resultados = [_renderizar(tarefa, pasta_saida) for tarefa in tarefas]
+        finally:
+            _df_processo = anterior
+            plt.switch_backend(backend)
+    else:
+        with DataFrameCompartilhado(df) as compartilhado, \
+                ProcessPoolExecutor(max_workers=n_processos, initializer=_iniciar_processo, initargs=(compartilhado.descritor,)) as executor:
+            resultados = list(executor.map(_renderizar, tarefas, [pasta_saida] * len(tarefas)))
+
+    tempos = pd.DataFrame(resultados, columns=COLUNAS_TEMPOS)
+    print(f"{len(tempos)} figuras salvas em: {pasta_saida} (soma dos tempos: {tempos['Total (s)'].sum():.2f} s)")
+    return tempos
+
+
+# Gera todas as figuras da análise univariada e bivariada de uma vez.
+def gerar_relatorio_figuras(df: pd.DataFrame, df_dict: pd.DataFrame, pasta_saida: str, coluna_alvo: str = 'performance_class', n_processos: int = None) -> pd.DataFrame:
+    tarefas = tarefas_univariadas(df, df_dict, coluna_alvo) + tarefas_bivariadas(df_dict)
+    return renderizar_figuras(df, tarefas, pasta_saida, n_processos)